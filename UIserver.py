@@ -8,11 +8,12 @@ Usage:
 Then open http://localhost:5011 in your browser.
 """
 
+import json
 import os
 import sys
 from pathlib import Path
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -121,6 +122,10 @@ def chat():
             "user_id": orchestrator.current_user_id,
             "session_id": orchestrator.current_session_id,
             "turn": orchestrator.turn_count,
+            # Verifications finish in the background, usually after this
+            # response: each drained item names the turn_number it belongs to.
+            "turn_number": orchestrator.turn_number,
+            "verifications": orchestrator.get_pending_verifications(),
         })
 
     except Exception as e:
@@ -128,6 +133,40 @@ def chat():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    Emits {"delta": ...} events as text arrives, then a final "done" event.
+    """
+    data = request.get_json(force=True)
+    user_input = (data.get("message") or "").strip()
+
+    if not user_input:
+        return jsonify({"error": "Empty message"}), 400
+
+    try:
+        orchestrator = get_orchestrator()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def generate():
+        try:
+            for delta in orchestrator.stream_process(user_input):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+            orchestrator.turn_count += 1
+            yield "event: done\ndata: " + json.dumps({
+                "user_id": orchestrator.current_user_id,
+                "session_id": orchestrator.current_session_id,
+                "turn": orchestrator.turn_count,
+            }) + "\n\n"
+        except Exception as e:
+            _logger.log_step("error", str(e))
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    return Response(generate(), mimetype="text/event-stream")
+
+
 @app.route("/status")
 def status():
     """
@@ -2,12 +2,17 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
+import asyncio
 import hashlib
 import json
 import os
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
 
 # Cache directory for RAG results
 CACHE_DIR = "cache/rag_results"
@@ -73,6 +78,90 @@ class RAGCache:
 # Global cache instance
 _rag_cache = RAGCache()
 
+class SemanticCache:
+    """
+    In-memory retrieval cache keyed by query embedding.
+
+    A query whose embedding has cosine similarity >= threshold with a cached
+    query reuses that query's documents, so paraphrases ("what is a Roth IRA?"
+    / "explain Roth IRAs") skip the vector search.  Exact repeats also skip
+    the embedding call.  Entries expire after ttl_seconds; the least recently
+    used entry is evicted past max_entries.
+    """
+
+    def __init__(self, vector_store, k: int = 3, threshold: float = 0.95,
+                 max_entries: int = 1000, ttl_seconds: float = 3600.0):
+        self.vector_store = vector_store
+        self.embeddings = vector_store.embeddings
+        self.k = k
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # query -> (created_at, unit-norm embedding, docs)
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray, list]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Stacked embeddings of the current entries, rebuilt only after a
+        # store or eviction (the role an IndexFlatIP would play).
+        self._index_keys: List[str] = []
+        self._index: Optional[np.ndarray] = None
+
+    def invoke(self, query: str) -> list:
+        """Return documents for query, from cache when a close match exists."""
+        now = time.monotonic()
+        with self._lock:
+            self._drop_expired(now)
+            entry = self._entries.get(query)
+            if entry is not None:
+                self._entries.move_to_end(query)
+                return entry[2]
+
+        vector = self.embeddings.embed_query(query)
+        unit = np.asarray(vector, dtype=np.float32)
+        unit /= (np.linalg.norm(unit) or 1.0)
+
+        with self._lock:
+            match = self._nearest(unit)
+            if match is not None:
+                self._entries.move_to_end(match)
+                return self._entries[match][2]
+
+        docs = self.vector_store.similarity_search_by_vector(vector, k=self.k)
+        with self._lock:
+            self._entries[query] = (now, unit, docs)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._index = None
+        return docs
+
+    async def abatch(self, queries: List[str]) -> List[list]:
+        """Resolve several queries concurrently (each on a worker thread)."""
+        return list(await asyncio.gather(
+            *(asyncio.to_thread(self.invoke, q) for q in queries)
+        ))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._index = None
+
+    def _nearest(self, unit: np.ndarray) -> Optional[str]:
+        if not self._entries:
+            return None
+        if self._index is None:
+            self._index_keys = list(self._entries)
+            self._index = np.stack([self._entries[key][1] for key in self._index_keys])
+        scores = self._index @ unit
+        best = int(np.argmax(scores))
+        return self._index_keys[best] if scores[best] >= self.threshold else None
+
+    def _drop_expired(self, now: float):
+        expired = [q for q, (t, _, _) in self._entries.items() if now - t > self.ttl_seconds]
+        for q in expired:
+            del self._entries[q]
+        if expired:
+            self._index = None
+
+
 def create_retriever(vector_store, k: int = 3):
     """
     Create a retriever from the vector store.
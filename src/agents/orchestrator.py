@@ -18,14 +18,23 @@ Key design decisions
 
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import re
+import threading
 import time
 import traceback
 import uuid
-from typing import Any, Dict, List
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Deque, Dict, Iterator, List, Optional, Tuple
 
+import httpx
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_openai import ChatOpenAI
 
 from agents.financial_planner import FinancialPlannerAgent
@@ -40,10 +49,142 @@ from core.checkpoint import CheckpointManager
 from core.evaluation import EvaluationMetrics
 from core.memory_manager import MemoryManager
 from core.state_manager import SessionPhase, StateManager
+from db.queries import login_and_fetch
 from tools.dateTime import TIME_TOOLS
+from tools.user_profile import get_user_profile
+from utils.async_processor import get_async_processor
 from utils.logger import AgentLogger
 
 
+# Greetings / procedural keywords — such turns skip answer verification.
+_CONVERSATIONAL_RE = re.compile(
+    r"\b(?:hi|hello|hey|thanks|thank you|bye|goodbye|register|login|logout|status|help)\b",
+    re.IGNORECASE,
+)
+
+
+# Exact (normalised) queries that map 1:1 onto a fixed action.
+_DIRECT_INTENTS: Dict[str, str] = {
+    "register":       "register",
+    "sign up":        "register",
+    "signup":         "register",
+    "create account": "register",
+    "login":          "login",
+    "log in":         "login",
+    "status":         "status",
+    "help":           "help",
+}
+
+_HELP_TEXT = (
+    "Here's what I can do:\n"
+    "  • Register or log in to save your financial profile\n"
+    "  • Build financial plans — budget, savings, debt, car, house, retirement\n"
+    "  • Research products and check affordability\n"
+    "  • Track alerts, spending and goal progress\n"
+    "  • Explain financial concepts from our knowledge base\n"
+    "Just ask in your own words!"
+)
+
+
+def _dumps(obj: Any) -> str:
+    """Compact JSON for tool payloads — no padding, non-ASCII kept as-is."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _close_loop(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    if loop.is_closed():
+        return
+    loop.run_until_complete(client.aclose())
+    loop.close()
+
+
+# History is replayed append-only so consecutive prompts share a prefix.
+# When it reaches _HISTORY_MAXLEN messages (two per turn), everything but the
+# last _HISTORY_KEEP is folded into a frozen summary in the system prompt.
+_HISTORY_MAXLEN = 20
+_HISTORY_KEEP   = 6
+
+# The LLM summary of folded history is written here, off the response path.
+_SUMMARY_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+
+# Tool payloads from earlier hops of the same turn are cut to this length.
+_STALE_TOOL_CHARS = 500
+
+# Per-document text sent back to the LLM from search_financial_documents.
+_DOC_PAYLOAD_CHARS = 800
+
+# Short queries without multi-step wording get a single tool round.
+_COMPLEX_QUERY_RE = re.compile(
+    r"\b(?:then|and also|plan|analy[sz]e|compare)\b", re.IGNORECASE
+)
+_MAX_TOOL_ROUNDS = 4
+
+
+def _max_tool_rounds(query: str) -> int:
+    if len(query) < 30 and not _COMPLEX_QUERY_RE.search(query):
+        return 1
+    return _MAX_TOOL_ROUNDS
+
+
+# Tools that log in or register, changing the user the other tools act for.
+# They run one at a time, before the other calls of the same hop.
+_STATEFUL_TOOLS = frozenset({"login_flow", "registration_flow"})
+
+# Upper bound on tool calls running at once within one LLM hop.
+_TOOL_CONCURRENCY_LIMIT = max(1, int(os.getenv("TOOL_CONCURRENCY_LIMIT", "4")))
+
+# How long a loaded user profile is reused across tool calls.
+_PROFILE_TTL_S = 5.0
+
+# OpenAI tool schemas keyed by (name, description) of each tool.  Converting a
+# tool builds a pydantic model per tool; the schemas are identical for every
+# orchestrator instance, so they are converted once per process.
+_TOOL_SCHEMA_CACHE: Dict[Tuple[Tuple[str, str], ...], List[Dict[str, Any]]] = {}
+
+
+def _openai_tool_schemas(tools: list) -> List[Dict[str, Any]]:
+    key     = tuple((t.name, t.description) for t in tools)
+    schemas = _TOOL_SCHEMA_CACHE.get(key)
+    if schemas is None:
+        schemas = [convert_to_openai_tool(t) for t in tools]
+        _TOOL_SCHEMA_CACHE[key] = schemas
+    return schemas
+
+
+# Static part of the orchestrator system prompt.  It leads the prompt
+# unchanged for every user and session so provider-side prefix caching can
+# reuse it; the per-session block is appended after it.
+_SYSTEM_PROMPT_STATIC = """You are CoFina, an intelligent financial assistant for young professionals.
+
+TOOLS
+─────
+registration_flow          — new account creation
+login_flow                 — log in an existing user (needs user_id + password)
+financial_planning_flow    — ALL financial planning: plans, budgets, goals, PDFs,
+                             debt, retirement, investing, car/house buying, savings.
+                             This tool classifies intent internally — always call it
+                             for financial topics rather than answering directly.
+market_research_flow       — product search, price comparison, affordability
+monitoring_flow            — alerts, spending tracker, goal progress
+get_user_status            — current auth status
+get_my_profile             — fetch the logged-in user's full profile
+search_financial_documents — educational questions: definitions, concepts, explanations
+TIME_TOOLS                 — date/time calculations
+
+ROUTING RULES
+─────────────
+• DEFINITION / CONCEPT questions ("What is X?", "Explain Y", "How does Z work?")
+  → search_financial_documents for grounded answers.
+• PLANNING / ACTION questions ("How should I buy a house?", "Help me pay off debt",
+  "Generate a plan", "Create a budget") → financial_planning_flow.
+  The tool decides internally whether to generate a PDF.
+• Never refuse to create a plan or PDF — always call financial_planning_flow.
+• LOGIN: ask for User ID and password together; call login_flow when you have both.
+• REGISTER: call registration_flow immediately.
+• Keep responses focused on financial well-being and actionable next steps.
+"""
+
+
 class CoFinaOrchestrator:
     """Main orchestrator — exposes specialised sub-agents as LLM tools."""
 
@@ -52,9 +193,10 @@ class CoFinaOrchestrator:
         self.logger  = AgentLogger()
 
         # Verification & timing
-        self.turn_number            = 0
-        self.last_rag_context       = ""
-        self.last_retrieval_time_ms = 0
+        self.turn_number = 0
+        # (RAG context, retrieval ms) per knowledge-base search this turn;
+        # searches may run concurrently, so each appends its own entry.
+        self._retrievals: List[Tuple[str, int]] = []
 
         # Core infrastructure
         self.state_manager       = StateManager()
@@ -73,31 +215,78 @@ class CoFinaOrchestrator:
 
         # RAG
         self.retriever = None
+        self.doc_cache = None
         try:
             from RAG.index import ensure_index
-            from RAG.retriever import create_retriever
+            from RAG.retriever import SemanticCache, create_retriever
             vector_store   = ensure_index(api_key)
             self.retriever = create_retriever(vector_store)
+            self.doc_cache = SemanticCache(vector_store, k=3)
             self.financial_planner.rag_retriever = self.retriever
             print(" ... RAG system ready")
         except Exception as exc:
             self.logger.log_step("warning", f"RAG init skipped: {exc}")
             print(f" ... RAG unavailable: {exc}")
 
-        # LLM (orchestrator level)
+        # Event loop + pooled HTTP client reused across turns, so gateway
+        # connections (TCP + TLS) stay alive between requests.
+        self._loop      = asyncio.new_event_loop()
+        self._loop_lock = threading.Lock()
+        self._tool_slots = asyncio.Semaphore(_TOOL_CONCURRENCY_LIMIT)
+        self._http_async_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+        # Closed on garbage collection or at interpreter exit, without the
+        # exit hook keeping the orchestrator itself alive.
+        self._finalizer = weakref.finalize(
+            self, _close_loop, self._loop, self._http_async_client
+        )
+
+        # LLMs (orchestrator level) — a small router model picks the first
+        # tools; once results are in, the full model either answers or asks
+        # for more tools.
         self.llm = ChatOpenAI(
             model="gemini-2.5-flash",
             temperature=0,
             api_key=api_key,
             base_url="https://ai-gateway.andrew.cmu.edu/",
+            http_async_client=self._http_async_client,
+        )
+        self.router_llm = ChatOpenAI(
+            model="gemini-2.5-flash-lite",
+            temperature=0,
+            api_key=api_key,
+            base_url="https://ai-gateway.andrew.cmu.edu/",
+            http_async_client=self._http_async_client,
         )
         self.tools          = self._build_tools()
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
+        tool_schemas        = _openai_tool_schemas(self.tools)
+        self.llm_with_tools = self.router_llm.bind_tools(tool_schemas)
+        self.followup_llm   = self.llm.bind_tools(tool_schemas)
+        # Same schemas so the answer model can read the tool transcript,
+        # but tool_choice="none" keeps it from issuing new calls once the
+        # round budget is spent.
+        self.answer_llm     = self.llm.bind_tools(tool_schemas, tool_choice="none")
+        self._tool_map      = {t.name: t for t in self.tools}
 
         # Session state
-        self.current_session_id: str  = str(uuid.uuid4())[:8]
+        self.current_session_id: str  = uuid.uuid4().hex[:8]
         self.current_user_id:    str  = "guest"
-        self.conversation_history: List = []
+        self.conversation_history: Deque = deque(maxlen=_HISTORY_MAXLEN)
+        self._history_summary: str = ""
+        # (session id, future) of an LLM summary still being written
+        self._summary_task: Optional[Tuple[str, Future]] = None
+
+        # Per-turn profile cache so chained tool calls share one DB read
+        self._profile_cache: Dict[str, Tuple[float, Dict]] = {}
+
+        # Background answer verification (task ids on the async processor)
+        self._pending_verifications: List[str] = []
+        self._turn_verification: Optional[str] = None
+
+        # System prompt cache — rebuilt only when auth/registration state changes
+        self._cached_system_message: Optional[SystemMessage] = None
+        self._cached_system_message_key: Optional[tuple] = None
 
     # ────────────────────────────────────────────────────────────────────
     # Tool definitions
@@ -106,17 +295,17 @@ class CoFinaOrchestrator:
     def _build_tools(self) -> list:
 
         @tool
-        def registration_flow(user_input: str) -> str:
+        def registration_flow(user_input: str) -> dict:
             """Start or continue user registration / sign-up."""
             result = self.registration_agent.process(
                 user_input,
                 {"user_id": self.current_user_id, "session_id": self.current_session_id},
             )
             self._handle_registration_result(result)
-            return json.dumps(result)
+            return result
 
         @tool
-        def financial_planning_flow(user_input: str) -> str:
+        def financial_planning_flow(user_input: str) -> dict:
             """
             Handle ALL financial planning requests including:
             - Creating or generating a financial plan or PDF
@@ -136,10 +325,10 @@ class CoFinaOrchestrator:
                 user_id=self.current_user_id,
                 context={"user_profile": profile, "session_id": self.current_session_id},
             )
-            return json.dumps(result)
+            return result
 
         @tool
-        def market_research_flow(user_input: str) -> str:
+        def market_research_flow(user_input: str) -> dict:
             """Product searches, price comparisons, and affordability checks."""
             profile = self._load_profile()
             result  = self.market_agent.process(
@@ -147,101 +336,95 @@ class CoFinaOrchestrator:
                 user_id=self.current_user_id,
                 context={"user_profile": profile, "session_id": self.current_session_id},
             )
-            return json.dumps(result)
+            return result
 
         @tool
-        def monitoring_flow(user_input: str) -> str:
+        def monitoring_flow(user_input: str) -> dict:
             """Financial alerts, spending tracking, and goal progress monitoring."""
             profile = self._load_profile()
             result  = self.monitor_agent.process(
                 user_id=self.current_user_id,
                 context={"user_profile": profile, "session_id": self.current_session_id},
             )
-            return json.dumps(result)
+            return result
 
         @tool
-        def login_flow(user_id: str, password: str) -> str:
+        def login_flow(user_id: str, password: str) -> dict:
             """
             Log an existing user in with their user_id and password.
             Ask for both together; call this tool as soon as you have both.
             Relay the returned 'message' word-for-word to the user.
             """
-            from db.queries import verify_login, user_exists, get_user_profile
-            if not user_exists(user_id):
-                return json.dumps({
+            login = login_and_fetch(user_id, password)
+            if not login["exists"]:
+                return {
                     "success": False,
                     "message": (
                         f" ... No account found for '{user_id}'. "
                         "Please check your User ID or say 'register' to create a new account."
                     ),
-                })
-            if verify_login(user_id, password):
+                }
+            if login["verified"]:
                 self.current_user_id = user_id
+                self._profile_cache.pop(user_id, None)
                 self.guardrail_agent.authenticate_session(self.current_session_id, user_id)
                 self.logger.log_step("login", {"user_id": user_id})
-                profile    = get_user_profile(user_id) or {}
-                first_name = profile.get("first_name", user_id)
-                return json.dumps({
+                first_name = login["profile"].get("first_name", user_id)
+                return {
                     "success": True,
                     "message": (
                         f" ... Welcome back, {first_name}! You're now logged in.\n"
                         "What would you like to do today? I can help with your "
                         "financial plan, debt tracking, savings goals, and more."
                     ),
-                })
-            return json.dumps({
+                }
+            return {
                 "success": False,
                 "message": (
                     " ... Incorrect password. Please try again, or say "
                     "'forgot password' if you'd like to reset it."
                 ),
-            })
+            }
 
         @tool
-        def get_user_status() -> str:
+        def get_user_status() -> dict:
             """Return the current user's authentication status."""
-            return json.dumps({
+            return {
                 "user_id":       self.current_user_id,
                 "authenticated": self.current_user_id != "guest",
                 "session_id":    self.current_session_id,
-            })
+            }
 
         @tool
-        def get_my_profile() -> str:
+        def get_my_profile() -> dict:
             """
             Fetch the full profile of the currently logged-in user.
             Use when the user asks what CoFina knows about them.
             """
             if self.current_user_id == "guest":
-                return json.dumps({"error": "Not logged in. Please log in first."})
+                return {"error": "Not logged in. Please log in first."}
             profile = self._load_profile()
             if not profile:
-                return json.dumps({"error": "Profile not found."})
-            return json.dumps(profile)
+                return {"error": "Profile not found."}
+            return profile
 
         @tool
-        def search_financial_documents(query: str) -> str:
+        def search_financial_documents(query: str) -> Any:
             """
             Search the financial knowledge base for concepts, definitions,
             and general guidance. Use for educational questions like
             'What is compound interest?' or 'How does a Roth IRA work?'
             """
             if not self.retriever:
-                return json.dumps({"error": "Knowledge base not available"})
+                return {"error": "Knowledge base not available"}
 
             t0   = time.perf_counter()
-            docs = self.retriever.invoke(query)
-            self.last_retrieval_time_ms = round((time.perf_counter() - t0) * 1000)
-
-            self.last_rag_context = "\n\n".join([
-                f"[{d.metadata.get('source', 'unknown')}]\n{d.page_content}"
-                for d in docs[:3]
-            ])
-            results = [
-                {"content": d.page_content, "source": d.metadata.get("source", "unknown")}
-                for d in docs[:3]
-            ]
-            return json.dumps(results)
+            docs = self.doc_cache.invoke(query) if self.doc_cache else self.retriever.invoke(query)
+            elapsed_ms = round((time.perf_counter() - t0) * 1000)
+
+            context, results = self._search_payload(docs)
+            self._retrievals.append((context, elapsed_ms))
+            return results
 
         return [
             registration_flow,
@@ -260,8 +443,84 @@ class CoFinaOrchestrator:
     # ────────────────────────────────────────────────────────────────────
 
     def process(self, user_query: str) -> str:
+        """Synchronous entry point — runs :meth:`aprocess` on the instance loop."""
+        with self._loop_lock:
+            return self._loop.run_until_complete(self.aprocess(user_query))
+
+    async def aprocess(self, user_query: str) -> str:
+        early = await self._begin_turn(user_query)
+        if early is not None:
+            return early
+
+        prefetch      = self._prefetch_profile()
+        messages      = self._build_messages(user_query)
+        response_text = await self._tool_loop(messages, user_query)
+        if prefetch is not None:
+            await prefetch
+        return self._finish_turn(user_query, response_text)
+
+    async def astream_process(self, user_query: str) -> AsyncIterator[str]:
+        """
+        Streaming variant of :meth:`aprocess`.  Yields answer text as the LLM
+        produces it; the timing badge and then the confidence badge (once
+        background verification finishes) arrive as trailing chunks.
+        """
+        early = await self._begin_turn(user_query)
+        if early is not None:
+            yield early
+            return
+
+        prefetch = self._prefetch_profile()
+        messages = self._build_messages(user_query)
+        streamed: List[str] = []
+        async for delta in self._stream_tool_loop(messages, user_query):
+            streamed.append(delta)
+            yield delta
+        if prefetch is not None:
+            await prefetch
+
+        response_text = "".join(streamed)
+        final_text    = self._finish_turn(user_query, response_text)
+        if len(final_text) > len(response_text):
+            yield final_text[len(response_text):]
+
+        if self._turn_verification is not None:
+            outcome = await self._await_verification(self._turn_verification)
+            if outcome and outcome["badge"]:
+                yield "\n\n" + outcome["badge"]
+
+    def stream_process(self, user_query: str) -> Iterator[str]:
+        """
+        Synchronous wrapper over :meth:`astream_process` for WSGI handlers.
+        The loop lock is held per chunk, not across yields, so a stream the
+        client stops reading never blocks other calls.
+        """
+        agen = self.astream_process(user_query)
+        try:
+            while True:
+                with self._loop_lock:
+                    try:
+                        delta = self._loop.run_until_complete(agen.__anext__())
+                    except StopAsyncIteration:
+                        break
+                yield delta
+        finally:
+            with self._loop_lock:
+                self._loop.run_until_complete(agen.aclose())
+
+    def close(self) -> None:
+        """Release the pooled HTTP client and the instance event loop."""
+        self._finalizer()
+
+    async def _begin_turn(self, user_query: str) -> Optional[str]:
+        """
+        Run the guardrail and the non-LLM routes (logout, active registration).
+        Returns the final response if one of them handled the turn, else None.
+        """
         self.logger.start_turn(user_query)
-        self.last_retrieval_time_ms = 0
+        self._retrievals = []
+        # Profiles are shared by the tool calls of one turn, never across turns
+        self._profile_cache.clear()
 
         # ── Guardrail ────────────────────────────────────────────────────
         guardrail = self.guardrail_agent.process(
@@ -285,8 +544,10 @@ class CoFinaOrchestrator:
             return response
 
         # ── Direct registration routing ──────────────────────────────────
+        # Off the loop: the confirm step may wait on the stage-1 insert.
         if self.registration_agent.is_active():
-            result = self.registration_agent.process(
+            result = await asyncio.to_thread(
+                self.registration_agent.process,
                 user_query,
                 {"user_id": self.current_user_id, "session_id": self.current_session_id},
             )
@@ -296,119 +557,362 @@ class CoFinaOrchestrator:
             self.logger.end_turn(response)
             return response
 
-        # ── LLM tool-calling loop ────────────────────────────────────────
-        messages = [SystemMessage(content=self._system_prompt())]
-        messages.extend(self.conversation_history[-6:])
-        messages.append(HumanMessage(content=user_query))
+        # ── Deterministic intents — no LLM round-trip needed ─────────────
+        intent = _DIRECT_INTENTS.get(_lc.rstrip(" .!?"))
+        if intent is not None:
+            self.logger.log_step("direct_intent", {"intent": intent})
+            response = self._direct_response(intent, user_query)
+            self._append_history(user_query, response)
+            self.logger.end_turn(response)
+            return response
 
-        response_text = self._tool_loop(messages, user_query)
+        return None
+
+    def _prefetch_profile(self) -> Optional[asyncio.Future]:
+        """
+        Load the logged-in user's profile on a worker thread while the router
+        LLM call is in flight, so profile-using tools find it in the cache.
+        """
+        if self.current_user_id == "guest":
+            return None
+        return asyncio.ensure_future(asyncio.to_thread(self._load_profile))
 
-        # ── Verification + timing badge ──────────────────────────────────
+    def _build_messages(self, user_query: str) -> list:
+        self._apply_history_summary()
+        messages = [self._system_message(), *self.conversation_history]
+        messages.append(HumanMessage(content=user_query))
+        return messages
+
+    def _finish_turn(self, user_query: str, response_text: str) -> str:
+        """
+        Append the timing badge, queue answer verification in the background
+        and close the turn.  The confidence badge is delivered later — see
+        :meth:`get_pending_verifications` / :meth:`astream_process`.
+        """
         self.turn_number += 1
-        if not self._is_conversational(user_query) and self.last_rag_context:
-            try:
-                verification = verify_response(
-                    question=user_query,
-                    answer=response_text,
-                    context=self.last_rag_context,
-                    api_key=self.api_key,
-                )
-                self.evaluator.log_verification(
-                    session_id=self.current_session_id,
-                    user_id=self.current_user_id,
-                    turn_number=self.turn_number,
-                    query=user_query,
-                    response=response_text,
-                    rag_context=self.last_rag_context,
-                    verification=verification,
-                )
-                self.logger.log_step("verification", verification)
-
-                badges = []
-                if self.last_retrieval_time_ms > 0:
-                    badges.append(f"⏱ Retrieved in {self.last_retrieval_time_ms}ms")
-                score = verification.get("score", 0.0)
-                if score >= 0.85:
-                    badges.append(f"✓ Verified (confidence: {score:.0%})")
-                elif score >= 0.7:
-                    badges.append(f"⚠️ Moderate confidence ({score:.0%})")
-                if badges:
-                    response_text += "\n\n" + "  │  ".join(badges)
-
-                self.last_rag_context       = ""
-                self.last_retrieval_time_ms = 0
-            except Exception as exc:
-                self.logger.log_step("verification_error", str(exc))
-                if self.last_retrieval_time_ms > 0:
-                    response_text += f"\n\n⏱ Retrieved in {self.last_retrieval_time_ms}ms"
-        elif self.last_retrieval_time_ms > 0:
-            response_text += f"\n\n⏱ Retrieved in {self.last_retrieval_time_ms}ms"
+        self._turn_verification = None
+        rag_context  = "\n\n".join(context for context, _ in self._retrievals if context)
+        retrieval_ms = max((ms for _, ms in self._retrievals), default=0)
+        self._retrievals = []
+        if not self._is_conversational(user_query) and rag_context:
+            self._turn_verification = get_async_processor().submit(
+                self._verify_and_log,
+                self.current_session_id,
+                self.current_user_id,
+                self.turn_number,
+                self.logger.current_turn_id,
+                user_query,
+                response_text,
+                rag_context,
+            )
+            self._pending_verifications.append(self._turn_verification)
+
+        if retrieval_ms > 0:
+            response_text += f"\n\n⏱ Retrieved in {retrieval_ms}ms"
 
         self.logger.end_turn(response_text)
         return response_text
 
+    # ────────────────────────────────────────────────────────────────────
+    # Background verification
+    # ────────────────────────────────────────────────────────────────────
+
+    def _verify_and_log(
+        self,
+        session_id: str,
+        user_id: str,
+        turn_number: int,
+        turn_id: Optional[str],
+        query: str,
+        response: str,
+        rag_context: str,
+    ) -> Dict[str, Any]:
+        """Runs on the async processor; returns the verification plus its badge."""
+        verification = verify_response(
+            question=query,
+            answer=response,
+            context=rag_context,
+            api_key=self.api_key,
+        )
+        try:
+            self.evaluator.log_verification(
+                session_id=session_id,
+                user_id=user_id,
+                turn_number=turn_number,
+                query=query,
+                response=response,
+                rag_context=rag_context,
+                verification=verification,
+            )
+            self.logger.log_step(
+                "verification", {"turn": turn_number, **verification}, turn_id=turn_id
+            )
+        except Exception as exc:
+            self.logger.log_step("verification_error", str(exc), turn_id=turn_id)
+
+        score = verification.get("score", 0.0)
+        badge = None
+        if score >= 0.85:
+            badge = f"✓ Verified (confidence: {score:.0%})"
+        elif score >= 0.7:
+            badge = f"⚠️ Moderate confidence ({score:.0%})"
+        return {"turn_number": turn_number, "verification": verification, "badge": badge}
+
+    def get_pending_verifications(self) -> List[Dict[str, Any]]:
+        """
+        Drain verifications that have finished since the last call.
+        Each item is {"turn_number", "verification", "badge"}.  Drained
+        results are removed from the processor as well.
+        """
+        processor = get_async_processor()
+        finished: List[Dict[str, Any]] = []
+        still_running: List[str] = []
+        for task_id in self._pending_verifications:
+            outcome = processor.pop_result(task_id)
+            if outcome is None:
+                still_running.append(task_id)
+                continue
+            if outcome["status"] == "completed":
+                finished.append(outcome["result"])
+        self._pending_verifications = still_running
+        return finished
+
+    async def _await_verification(self, task_id: str) -> Optional[Dict[str, Any]]:
+        processor = get_async_processor()
+        while not processor.is_ready(task_id):
+            await asyncio.sleep(0.05)
+        if task_id in self._pending_verifications:
+            self._pending_verifications.remove(task_id)
+        outcome = processor.pop_result(task_id)
+        return outcome["result"] if outcome["status"] == "completed" else None
+
     # ────────────────────────────────────────────────────────────────────
     # LLM tool loop
     # ────────────────────────────────────────────────────────────────────
 
-    def _tool_loop(self, messages: list, user_query: str) -> str:
-        tool_map  = {t.name: t for t in self.tools}
-        max_turns = 4
+    async def _tool_loop(self, messages: list, user_query: str) -> str:
+        # The router picks the first hop; after tool results are in, the
+        # full model either answers (that reply is final) or calls more
+        # tools.  One tool round therefore costs two LLM calls.
+        model = self.llm_with_tools
 
-        for _ in range(max_turns):
-            try:
-                llm_response = self.llm_with_tools.invoke(messages)
+        try:
+            for _ in range(_max_tool_rounds(user_query)):
+                llm_response = await model.ainvoke(messages)
+                tool_calls   = getattr(llm_response, "tool_calls", None) or []
                 messages.append(llm_response)
-                tool_calls = getattr(llm_response, "tool_calls", None) or []
 
                 if not tool_calls:
                     final = llm_response.content
                     self._append_history(user_query, final)
                     return final
 
-                for call in tool_calls:
-                    name    = call.get("name")
-                    args    = call.get("args", {})
-                    call_id = call.get("id")
-
-                    self.logger.log_step("tool_call", {"tool": name, "args": args})
-                    print(f"🛠️  {name}({args})")
-
-                    fn = tool_map.get(name)
-                    if fn:
-                        try:
-                            result = fn.invoke(args)
-                            try:
-                                parsed  = json.loads(result) if isinstance(result, str) else result
-                                success = not ("error" in parsed or parsed.get("success") is False)
-                                self.evaluator.log_tool_call(self.current_session_id, name, success)
-                            except Exception:
-                                pass
-                        except Exception as exc:
-                            result = json.dumps({"error": str(exc)})
-                            self.evaluator.log_tool_call(self.current_session_id, name, False)
-                    else:
-                        result = json.dumps({"error": f"Unknown tool: {name}"})
-                        self.evaluator.log_tool_call(self.current_session_id, name, False)
-
-                    print(f"📦  → {str(result)[:200]}")
-                    messages.append(ToolMessage(content=str(result), tool_call_id=call_id))
+                await self._run_tool_calls(messages, tool_calls)
+                model = self.followup_llm
 
-                    try:
-                        parsed = json.loads(result)
-                        self._handle_registration_result(parsed)
-                    except Exception:
-                        pass
+            # Round budget spent with tool results pending: the answer model
+            # writes the reply without issuing further calls.
+            llm_response = await self.answer_llm.ainvoke(messages)
+            messages.append(llm_response)
+            final = llm_response.content
+            self._append_history(user_query, final)
+            return final
 
-            except Exception as exc:
-                error_msg = f"Processing error: {exc}"
-                print(traceback.format_exc())
-                self.logger.log_step("error", error_msg)
-                return f"I encountered an error: {error_msg}"
+        except Exception as exc:
+            error_msg = f"Processing error: {exc}"
+            self.logger.debug("traceback", traceback.format_exc)
+            self.logger.log_step("error", error_msg)
+            return f"I encountered an error: {error_msg}"
+
+    async def _stream_tool_loop(self, messages: list, user_query: str) -> AsyncIterator[str]:
+        """
+        Same loop as :meth:`_tool_loop`, yielding the same final text.  A hop
+        that may still call tools is buffered: its text is yielded only once
+        the hop ends without tool calls, so text preceding a tool call is
+        never sent.  Only the tool-less answer model streams live.
+        """
+        model = self.llm_with_tools
 
-        last_content = getattr(messages[-1], "content", "I need more information to help you.")
-        self._append_history(user_query, last_content)
-        return last_content
+        try:
+            for _ in range(_max_tool_rounds(user_query)):
+                llm_response = None
+                async for chunk in model.astream(messages):
+                    llm_response = chunk if llm_response is None else llm_response + chunk
+                if llm_response is None:
+                    llm_response = AIMessage(content="")
+                tool_calls = getattr(llm_response, "tool_calls", None) or []
+                messages.append(llm_response)
+
+                if not tool_calls:
+                    if llm_response.content:
+                        yield llm_response.content
+                    self._append_history(user_query, llm_response.content)
+                    return
+
+                await self._run_tool_calls(messages, tool_calls)
+                model = self.followup_llm
+
+            llm_response = None
+            async for chunk in self.answer_llm.astream(messages):
+                llm_response = chunk if llm_response is None else llm_response + chunk
+                if chunk.content:
+                    yield chunk.content
+            if llm_response is None:
+                llm_response = AIMessage(content="")
+            messages.append(llm_response)
+            self._append_history(user_query, llm_response.content)
+
+        except Exception as exc:
+            error_msg = f"Processing error: {exc}"
+            self.logger.debug("traceback", traceback.format_exc)
+            self.logger.log_step("error", error_msg)
+            yield f"I encountered an error: {error_msg}"
+
+    async def _run_tool_calls(self, messages: list, tool_calls: list) -> None:
+        self._compact_stale_tool_results(messages)
+
+        # Several knowledge-base lookups in one hop share a single batched
+        # retriever call instead of running one search per tool call.
+        searches = [c for c in tool_calls if c.get("name") == "search_financial_documents"]
+        batch    = None
+        if self.retriever is not None and len(searches) > 1:
+            batch = asyncio.ensure_future(self._search_batch(
+                [c.get("args", {}).get("query", "") for c in searches]
+            ))
+        search_slot = {id(c): i for i, c in enumerate(searches)}
+
+        def dispatch(call: Dict[str, Any]) -> Awaitable[Tuple[str, Optional[Dict[str, Any]]]]:
+            pending = None
+            if batch is not None and id(call) in search_slot:
+                pending = self._batch_item(batch, search_slot[id(call)])
+            return self._dispatch_tool(call, pending)
+
+        # State-changing calls go first, one at a time; the remaining
+        # read-only calls then run concurrently.  Results are appended in
+        # the order the LLM issued them.
+        outcomes: Dict[int, Tuple[str, Optional[Dict[str, Any]]]] = {}
+        for call in tool_calls:
+            if call.get("name") in _STATEFUL_TOOLS:
+                outcomes[id(call)] = await dispatch(call)
+        readers = [c for c in tool_calls if id(c) not in outcomes]
+        for call, outcome in zip(readers, await asyncio.gather(*map(dispatch, readers))):
+            outcomes[id(call)] = outcome
+
+        for call in tool_calls:
+            content, parsed = outcomes[id(call)]
+            messages.append(
+                ToolMessage(content=content, tool_call_id=call.get("id"), name=call.get("name"))
+            )
+            if parsed is not None:
+                self._handle_registration_result(parsed)
+
+    @staticmethod
+    def _compact_stale_tool_results(messages: list) -> None:
+        """
+        Truncate tool payloads from earlier hops before a new round is added,
+        so each re-sent prompt carries only the latest results in full.
+        """
+        for i, msg in enumerate(messages):
+            if isinstance(msg, ToolMessage) and len(msg.content) > _STALE_TOOL_CHARS:
+                messages[i] = ToolMessage(
+                    content=msg.content[:_STALE_TOOL_CHARS] + " …[truncated]",
+                    tool_call_id=msg.tool_call_id,
+                    name=msg.name,
+                )
+
+    async def _search_batch(self, queries: List[str]) -> List[list]:
+        t0        = time.perf_counter()
+        if self.doc_cache is not None:
+            doc_lists = await self.doc_cache.abatch(queries)
+        else:
+            doc_lists = await self.retriever.abatch(queries, config={"max_concurrency": 5})
+        elapsed_ms = round((time.perf_counter() - t0) * 1000)
+
+        payloads = []
+        for docs in doc_lists:
+            context, results = self._search_payload(docs)
+            self._retrievals.append((context, elapsed_ms))
+            payloads.append(results)
+        return payloads
+
+    @staticmethod
+    async def _batch_item(batch: "asyncio.Future", index: int) -> Any:
+        return (await batch)[index]
+
+    @staticmethod
+    def _search_payload(docs: list) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        Return (RAG context for verification, tool payload) for the top 3 docs.
+        The verifier gets full chunks; the LLM payload is trimmed per chunk.
+        """
+        top     = docs[:3]
+        context = "\n\n".join(
+            f"[{d.metadata.get('source', 'unknown')}]\n{d.page_content}" for d in top
+        )
+        results = [
+            {
+                "content": d.page_content[:_DOC_PAYLOAD_CHARS],
+                "source":  d.metadata.get("source", "unknown"),
+            }
+            for d in top
+        ]
+        return context, results
+
+    async def _dispatch_tool(
+        self, call: Dict[str, Any], pending: Optional[Awaitable[Any]] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Run one tool call off the event loop.  Tools return plain dicts/lists;
+        they are serialized exactly once here for the ToolMessage.
+        ``pending`` supplies an already-scheduled result (batched searches).
+        Returns (message content, result dict or None).
+        """
+        name = call.get("name")
+        args = call.get("args", {})
+
+        self.logger.log_step("tool_call", {"tool": name, "args": args})
+        self._on_tool_start(name, args)
+
+        fn = self._tool_map.get(name)
+        t0 = time.perf_counter()
+        if pending is not None:
+            try:
+                result = await pending
+            except Exception as exc:
+                result = self._tool_error(name, exc)
+        elif fn:
+            try:
+                async with self._tool_slots:
+                    result = await fn.ainvoke(args)
+            except Exception as exc:
+                result = self._tool_error(name, exc)
+        else:
+            result = {"error": f"Unknown tool: {name}"}
+
+        parsed = result if isinstance(result, dict) else None
+        if parsed is not None:
+            success = not ("error" in parsed or parsed.get("success") is False)
+            self.evaluator.log_tool_call(self.current_session_id, name, success)
+
+        content = result if isinstance(result, str) else _dumps(result)
+        self._on_tool_end(name, content, round((time.perf_counter() - t0) * 1000))
+        return content, parsed
+
+    def _tool_error(self, name: str, exc: Exception) -> Dict[str, str]:
+        """Short error payload for the LLM; the traceback only goes to the debug log."""
+        self.logger.log_step("tool_error", {"tool": name, "error": str(exc)})
+        self.logger.debug("traceback", traceback.format_exc)
+        return {"error": str(exc)[:200]}
+
+    # Console instrumentation hooks — app.InstrumentedOrchestrator overrides these.
+    def _on_tool_start(self, name: str, args: Dict[str, Any]) -> None:
+        pass
+
+    def _on_tool_end(self, name: str, content: str, elapsed_ms: int) -> None:
+        self.logger.debug(
+            "tool_result_preview",
+            lambda: {"tool": name, "elapsed_ms": elapsed_ms, "preview": content[:200]},
+        )
 
     # ────────────────────────────────────────────────────────────────────
     # Registration result handler
@@ -419,6 +923,7 @@ class CoFinaOrchestrator:
         data   = result.get("data", {})
         if action == "complete" and data.get("user_id"):
             self.current_user_id = data["user_id"]
+            self._profile_cache.pop(self.current_user_id, None)
             self.guardrail_agent.authenticate_session(
                 self.current_session_id, self.current_user_id
             )
@@ -431,17 +936,74 @@ class CoFinaOrchestrator:
     def _load_profile(self) -> Dict:
         if self.current_user_id == "guest":
             return {}
+        user_id = self.current_user_id
+        cached  = self._profile_cache.get(user_id)
+        now     = time.monotonic()
+        if cached and now - cached[0] < _PROFILE_TTL_S:
+            return cached[1]
         try:
-            from tools.user_profile import get_user_profile
-            return get_user_profile(self.current_user_id) or {}
+            profile = get_user_profile(user_id) or {}
         except Exception:
             return {}
+        self._profile_cache[user_id] = (now, profile)
+        return profile
 
     def _append_history(self, user_query: str, response: str) -> None:
         self.conversation_history.append(HumanMessage(content=user_query))
         self.conversation_history.append(AIMessage(content=response))
-        if len(self.conversation_history) > 20:
-            self.conversation_history = self.conversation_history[-20:]
+        if len(self.conversation_history) >= _HISTORY_MAXLEN:
+            self._compact_history()
+
+    def _compact_history(self) -> None:
+        """
+        Fold all but the last _HISTORY_KEEP messages into the running summary.
+        Runs once per (_HISTORY_MAXLEN - _HISTORY_KEEP) / 2 turns; between
+        compactions the summary and replayed history are only ever appended to.
+
+        The LLM summary is written in the background so the reply is not held
+        up; until it lands the prompt carries the tail of the raw text.
+        """
+        self._apply_history_summary()
+        history = self.conversation_history
+        older   = [history.popleft() for _ in range(len(history) - _HISTORY_KEEP)]
+        lines   = [self._history_summary] if self._history_summary else []
+        lines.extend(
+            f"{'User' if isinstance(m, HumanMessage) else 'Agent'}: {m.content}"
+            for m in older
+        )
+        text = "\n".join(lines)
+        self._history_summary = text[-800:]
+        self._summary_task = (
+            self.current_session_id,
+            _SUMMARY_EXECUTOR.submit(self.summarizer_agent.process, text, max_length=800),
+        )
+
+    def _apply_history_summary(self) -> None:
+        """Swap in the background LLM summary once it has finished."""
+        if self._summary_task is None:
+            return
+        session_id, future = self._summary_task
+        if not future.done():
+            return
+        self._summary_task = None
+        if session_id != self.current_session_id:
+            return                              # logged out meanwhile
+        try:
+            self._history_summary = future.result()["summary"]
+        except Exception as exc:
+            self.logger.log_step("warning", f"history summary failed: {exc}")
+
+    def _system_message(self) -> SystemMessage:
+        key = (
+            self.current_user_id,
+            self.current_session_id,
+            self.registration_agent.is_active(),
+            self._history_summary,
+        )
+        if self._cached_system_message_key != key:
+            self._cached_system_message     = SystemMessage(content=self._system_prompt())
+            self._cached_system_message_key = key
+        return self._cached_system_message
 
     def _system_prompt(self) -> str:
         reg_status = (
@@ -454,47 +1016,40 @@ class CoFinaOrchestrator:
             if self.current_user_id != "guest"
             else "Guest (not logged in)"
         )
-        return f"""You are CoFina, an intelligent financial assistant for young professionals.
-
-SESSION
-───────
-User         : {auth_status}
-Session ID   : {self.current_session_id}
-Registration : {reg_status}
-
-TOOLS
-─────
-registration_flow          — new account creation
-login_flow                 — log in an existing user (needs user_id + password)
-financial_planning_flow    — ALL financial planning: plans, budgets, goals, PDFs,
-                             debt, retirement, investing, car/house buying, savings.
-                             This tool classifies intent internally — always call it
-                             for financial topics rather than answering directly.
-market_research_flow       — product search, price comparison, affordability
-monitoring_flow            — alerts, spending tracker, goal progress
-get_user_status            — current auth status
-get_my_profile             — fetch the logged-in user's full profile
-search_financial_documents — educational questions: definitions, concepts, explanations
-TIME_TOOLS                 — date/time calculations
-
-ROUTING RULES
-─────────────
-• DEFINITION / CONCEPT questions ("What is X?", "Explain Y", "How does Z work?")
-  → search_financial_documents for grounded answers.
-• PLANNING / ACTION questions ("How should I buy a house?", "Help me pay off debt",
-  "Generate a plan", "Create a budget") → financial_planning_flow.
-  The tool decides internally whether to generate a PDF.
-• Never refuse to create a plan or PDF — always call financial_planning_flow.
-• LOGIN: ask for User ID and password together; call login_flow when you have both.
-• REGISTER: call registration_flow immediately.
-• Keep responses focused on financial well-being and actionable next steps.
-"""
+        return _SYSTEM_PROMPT_STATIC + (
+            "\n"
+            "SESSION\n"
+            "───────\n"
+            f"User         : {auth_status}\n"
+            f"Session ID   : {self.current_session_id}\n"
+            f"Registration : {reg_status}\n"
+        ) + (
+            "\nEARLIER IN THIS CONVERSATION\n"
+            "────────────────────────────\n"
+            f"{self._history_summary}\n"
+            if self._history_summary else ""
+        )
 
     def _is_conversational(self, query: str) -> bool:
-        patterns = ["hi", "hello", "hey", "thanks", "thank you", "bye",
-                    "goodbye", "register", "login", "logout", "status", "help"]
-        q = query.lower()
-        return any(p in q for p in patterns) or len(query.split()) < 4
+        return bool(_CONVERSATIONAL_RE.search(query)) or len(query.split()) < 4
+
+    def _direct_response(self, intent: str, user_query: str) -> str:
+        if intent == "register":
+            result = self.registration_agent.process(
+                user_query,
+                {"user_id": self.current_user_id, "session_id": self.current_session_id},
+            )
+            self._handle_registration_result(result)
+            return result["message"]
+        if intent == "login":
+            if self.current_user_id != "guest":
+                return f"You're already logged in as {self.current_user_id}."
+            return "Sure — please send your User ID and password together to log in."
+        if intent == "status":
+            if self.current_user_id != "guest":
+                return f"You're logged in as {self.current_user_id} (session {self.current_session_id})."
+            return f"You're browsing as a guest (session {self.current_session_id}). Say 'login' or 'register' to get started."
+        return _HELP_TEXT
 
     def _guardrail_response(self, result: Dict) -> str:
         actions = result.get("actions", [])
@@ -513,6 +1068,8 @@ ROUTING RULES
     def logout(self) -> None:
         self.guardrail_agent.end_session(self.current_session_id)
         self.current_user_id      = "guest"
-        self.current_session_id   = str(uuid.uuid4())[:8]
-        self.conversation_history = []
+        self.current_session_id   = uuid.uuid4().hex[:8]
+        self.conversation_history.clear()
+        self._history_summary = ""
+        self._profile_cache.clear()
         self.registration_agent.reset()
\ No newline at end of file
@@ -18,37 +18,175 @@ Removed from original flow (can be collected later via profile update):
 
 from __future__ import annotations
 
+import logging
 import re
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
 
-from db.queries import email_exists, register_user, user_exists
-from tools.user_profile import create_financial_plan, update_user_preferences, update_user_profile
+from db.queries import email_exists, register_user, save_registration, user_id_taken
+
+_log = logging.getLogger(__name__)
+
+# Stage-1 inserts get their own worker so they never queue behind
+# background verifications on the shared async processor.
+_STAGE1_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stage1-save")
+_STAGE1_WAIT_S = 10.0
 
 
 # ---------------------------------------------------------------------------
 # Step definitions  (10 user-facing fields + 1 confirm)
 # ---------------------------------------------------------------------------
 
-STEPS: List[Dict[str, str]] = [
+class Step(NamedTuple):
+    step:    str
+    field:   str
+    prompt:  str
+    section: str
+
+
+STEPS: Tuple[Step, ...] = (
     # ── Stage 1: Authentication ──────────────────────────────────────────
-    {"step": "user_id",         "field": "user_id",         "prompt": "Choose a User ID (min 3 characters):",               "section": "auth"},
-    {"step": "first_name",      "field": "first_name",      "prompt": "Your first name:",                                   "section": "auth"},
-    {"step": "email",           "field": "email",           "prompt": "Your email address:",                                "section": "auth"},
-    {"step": "password",        "field": "password",        "prompt": "Create a password (min 6 characters):",              "section": "auth"},
-    {"step": "secret_question", "field": "secret_question", "prompt": "Choose a secret question (for account recovery):",   "section": "auth"},
-    {"step": "secret_answer",   "field": "secret_answer",   "prompt": "Your answer to that question:",                      "section": "auth"},
+    Step("user_id",         "user_id",         "Choose a User ID (min 3 characters):",               "auth"),
+    Step("first_name",      "first_name",      "Your first name:",                                   "auth"),
+    Step("email",           "email",           "Your email address:",                                "auth"),
+    Step("password",        "password",        "Create a password (min 6 characters):",              "auth"),
+    Step("secret_question", "secret_question", "Choose a secret question (for account recovery):",   "auth"),
+    Step("secret_answer",   "secret_answer",   "Your answer to that question:",                      "auth"),
 
     # ── Stage 2: Financial profile ───────────────────────────────────────
-    {"step": "monthly_income",  "field": "monthly_income",  "prompt": "Your monthly take-home income ($):",                 "section": "finance"},
-    {"step": "risk_profile",    "field": "risk_profile",    "prompt": "Investment risk tolerance (Low / Moderate / High):", "section": "finance"},
-    {"step": "short_term_goal", "field": "short_term",      "prompt": "Short-term goal (1-2 years, e.g. 'Save $5 000'):",  "section": "finance"},
-    {"step": "long_term_goal",  "field": "long_term",       "prompt": "Long-term goal (5+ years, e.g. 'Buy a house'):",    "section": "finance"},
+    Step("monthly_income",  "monthly_income",  "Your monthly take-home income ($):",                 "finance"),
+    Step("risk_profile",    "risk_profile",    "Investment risk tolerance (Low / Moderate / High):", "finance"),
+    Step("short_term_goal", "short_term",      "Short-term goal (1-2 years, e.g. 'Save $5 000'):",   "finance"),
+    Step("long_term_goal",  "long_term",       "Long-term goal (5+ years, e.g. 'Buy a house'):",     "finance"),
 
     # ── Confirmation ──────────────────────────────────────────────────────
-    {"step": "confirm_all", "field": "confirm", "prompt": "All set! Create your account now? (yes / no):", "section": "confirm"},
-]
+    Step("confirm_all", "confirm", "All set! Create your account now? (yes / no):", "confirm"),
+)
+
+_STEP_INDEX: Mapping[str, int] = MappingProxyType({s.step: i for i, s in enumerate(STEPS)})
+
+# "ask" reply per step, shared across sessions (replies are read-only).
+_ASK_REPLIES: Tuple[Dict[str, Any], ...] = tuple(
+    {"action": "ask", "message": s.prompt, "data": {"field": s.field}}
+    for s in STEPS
+)
+
+_WELCOME_MSG = (
+    "Welcome! Let's set up your CoFina account — it only takes a minute.\n\n"
+    + STEPS[0].prompt
+)
+_RESTART_MSG = "No problem! Let's start over.\n\n" + STEPS[0].prompt
+
+# Indexed by step: index of the first step of the following section.
+_SECTION_END: Tuple[int, ...] = tuple(
+    next(
+        (j for j in range(i, len(STEPS)) if STEPS[j].section != s.section),
+        len(STEPS),
+    )
+    for i, s in enumerate(STEPS)
+)
+
+# Stage 1 is saved as soon as the step index reaches the end of "auth".
+_STAGE1_END = _SECTION_END[_STEP_INDEX["user_id"]]
+
+_EMAIL_RE = re.compile(r"^[\w.\-+]+@[\w.\-]+\.\w{2,}\Z")
+_RISK_PROFILES = frozenset({"low", "moderate", "high"})
+_YES = frozenset({"yes", "y"})
+_START_RE = re.compile(r"register|sign\s*up|(?:new|create)\s+account", re.IGNORECASE)
+
+# Currency / percent decoration stripped in one pass before float().
+_STRIP_TBL = str.maketrans("", "", "$,% \t")
 
-_STEP_INDEX: Dict[str, int] = {s["step"]: i for i, s in enumerate(STEPS)}
+
+def _parse_money(value: str) -> float:
+    return float(value.translate(_STRIP_TBL))
+
+
+# ---------------------------------------------------------------------------
+# Validators — keyed by field; each gets (raw value, lowercased value, step)
+# and returns (retry reply, values to store)
+# ---------------------------------------------------------------------------
+
+Validation = Tuple[Optional[Dict[str, Any]], Mapping[str, Any]]
+
+_NO_VALUES: Mapping[str, Any] = MappingProxyType({})
+
+
+def _retry(field: str, message: str) -> Dict[str, Any]:
+    return {"action": "retry", "message": message, "data": {"field": field}}
+
+
+# Static retry replies, built once and shared like _ASK_REPLIES.
+_RETRY_USER_ID_SHORT = _retry("user_id",        "User ID must be at least 3 characters. Try again:")
+_RETRY_EMAIL_INVALID = _retry("email",          "That doesn't look like a valid email address. Try again:")
+_RETRY_EMAIL_TAKEN   = _retry("email",          "That email is already registered. Please use another:")
+_RETRY_PASSWORD      = _retry("password",       "Password must be at least 6 characters. Try again:")
+_RETRY_INCOME_FORMAT = _retry("monthly_income", "Please enter a valid dollar amount (e.g. 3500 or 3,500):")
+_RETRY_INCOME_NEG    = _retry("monthly_income", "Income cannot be negative. Try again:")
+_RETRY_RISK          = _retry("risk_profile",   "Please enter Low, Moderate, or High:")
+_RETRY_STILL_SAVING  = _retry("confirm",        "Still creating your account — reply 'yes' again in a moment:")
+_RETRY_EMPTY: Mapping[str, Dict[str, Any]] = MappingProxyType(
+    {s.field: _retry(s.field, f"{s.prompt} cannot be empty.") for s in STEPS}
+)
+
+
+def _v_user_id(value: str, value_lc: str, step_def: Step) -> Validation:
+    if len(value) < 3:
+        return _RETRY_USER_ID_SHORT, _NO_VALUES
+    if user_id_taken(value):
+        return _retry("user_id", f"'{value}' is already taken. Please choose another User ID:"), _NO_VALUES
+    return None, {"user_id": value}
+
+
+def _v_email(value: str, value_lc: str, step_def: Step) -> Validation:
+    if not _EMAIL_RE.match(value):
+        return _RETRY_EMAIL_INVALID, _NO_VALUES
+    if email_exists(value):
+        return _RETRY_EMAIL_TAKEN, _NO_VALUES
+    return None, {"email": value}
+
+
+def _v_password(value: str, value_lc: str, step_def: Step) -> Validation:
+    if len(value) < 6:
+        return _RETRY_PASSWORD, _NO_VALUES
+    return None, {"password": value}
+
+
+def _v_monthly_income(value: str, value_lc: str, step_def: Step) -> Validation:
+    try:
+        amount = _parse_money(value)
+    except ValueError:
+        return _RETRY_INCOME_FORMAT, _NO_VALUES
+    if amount < 0:
+        return _RETRY_INCOME_NEG, _NO_VALUES
+    return None, {
+        "monthly_income": round(amount, 2),
+        "annual_income":  round(amount * 12, 2),   # auto-derived
+    }
+
+
+def _v_risk_profile(value: str, value_lc: str, step_def: Step) -> Validation:
+    if value_lc not in _RISK_PROFILES:
+        return _RETRY_RISK, _NO_VALUES
+    return None, {"risk_profile": value.title()}
+
+
+def _v_nonempty(value: str, value_lc: str, step_def: Step) -> Validation:
+    """first_name, secret question/answer, short/long-term goals — free text."""
+    if not value:
+        return _RETRY_EMPTY[step_def.field], _NO_VALUES
+    return None, {step_def.field: value}
+
+
+_VALIDATORS: Dict[str, Callable[[str, str, Step], Validation]] = {
+    "user_id":        _v_user_id,
+    "email":          _v_email,
+    "password":       _v_password,
+    "monthly_income": _v_monthly_income,
+    "risk_profile":   _v_risk_profile,
+}
 
 
 # ---------------------------------------------------------------------------
@@ -72,8 +210,13 @@ class RegistrationAgent:
         "message": str,
         "data":    dict
     }
+
+    Prompt and retry replies are shared module constants — treat every
+    response dict as read-only.
     """
 
+    __slots__ = ("data", "current_flow", "step_index", "_stage1_saved", "_stage1_task")
+
     def __init__(self) -> None:
         self.reset()
 
@@ -87,21 +230,16 @@ class RegistrationAgent:
         self.current_flow: Optional[str] = None
         self.step_index: int = 0
         self._stage1_saved: bool = False
+        self._stage1_task: Optional[Future] = None
 
     def process(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         clean = query.strip()
 
         if not self.current_flow:
-            triggers = ["register", "sign up", "signup", "new account", "create account"]
-            if any(kw in clean.lower() for kw in triggers):
+            if _START_RE.search(clean):
                 self.current_flow = "registration"
                 self.step_index = 0
-                return self._reply(
-                    "start",
-                    "Welcome! Let's set up your CoFina account — it only takes a minute.\n\n"
-                    + STEPS[0]["prompt"],
-                    field=STEPS[0]["field"],
-                )
+                return self._reply("start", _WELCOME_MSG, field=STEPS[0].field)
             return self._reply(
                 "clarify",
                 "I can register you and set up your financial profile. "
@@ -114,19 +252,27 @@ class RegistrationAgent:
 
     def _handle_step(self, value: str) -> Dict[str, Any]:
         step_def = STEPS[self.step_index]
-        step_name = step_def["step"]
+        step_name = step_def.step
+        value_lc = value.lower()
+
+        # Surface a failed background Stage-1 save; must be settled by confirm
+        failed = self._reconcile_stage1(wait=step_name == "confirm_all")
+        if failed is not None:
+            return failed
 
         if step_name == "confirm_all":
-            return self._handle_confirm(value)
+            return self._handle_confirm(value_lc)
 
-        error = self._validate_and_store(step_def, value)
-        if error:
-            return self._reply("retry", error, field=step_def["field"])
+        validate = _VALIDATORS.get(step_def.field, _v_nonempty)
+        retry, values = validate(value, value_lc, step_def)
+        if retry is not None:
+            return retry
+        self.data.update(values)
 
         self.step_index += 1
 
         # Save Stage 1 immediately when auth section finishes
-        if step_def["section"] == "auth" and STEPS[self.step_index]["section"] != "auth":
+        if self.step_index == _STAGE1_END:
             result = self._save_stage1()
             if result is not None:
                 return result
@@ -135,159 +281,88 @@ class RegistrationAgent:
 
     # ── Confirm handler ──────────────────────────────────────────────────
 
-    def _handle_confirm(self, value: str) -> Dict[str, Any]:
-        if value.lower() in ("yes", "y"):
+    def _handle_confirm(self, value_lc: str) -> Dict[str, Any]:
+        if value_lc in _YES:
             return self._save_stage2()
         self.reset()
-        return self._reply(
-            "restart",
-            "No problem! Let's start over.\n\n" + STEPS[0]["prompt"],
-            field=STEPS[0]["field"],
-        )
-
-    # ── Validation ───────────────────────────────────────────────────────
+        return self._reply("restart", _RESTART_MSG, field=STEPS[0].field)
 
-    def _validate_and_store(self, step_def: Dict, value: str) -> Optional[str]:
-        section = step_def["section"]
-        if section == "auth":
-            return self._validate_auth(step_def, value)
-        if section == "finance":
-            return self._validate_finance(step_def, value)
-        return None
-
-    def _validate_auth(self, step_def: Dict, value: str) -> Optional[str]:
-        field = step_def["field"]
-
-        if field == "user_id":
-            if len(value) < 3:
-                return "User ID must be at least 3 characters. Try again:"
-            if user_exists(value):
-                return f"'{value}' is already taken. Please choose another User ID:"
-            self.data[field] = value
-            return None
-
-        if field == "email":
-            if not re.match(r"^[\w.\-+]+@[\w.\-]+\.\w{2,}$", value):
-                return "That doesn't look like a valid email address. Try again:"
-            if email_exists(value):
-                return "That email is already registered. Please use another:"
-            self.data[field] = value
-            return None
+    # ── Save helpers ─────────────────────────────────────────────────────
 
-        if field == "password":
-            if len(value) < 6:
-                return "Password must be at least 6 characters. Try again:"
-            self.data[field] = value
+    def _save_stage1(self) -> Optional[Dict[str, Any]]:
+        """
+        Insert the user row once the auth steps complete.  The insert (two
+        bcrypt hashes + commit) runs on a dedicated worker while the user
+        answers the finance questions; see :meth:`_reconcile_stage1`.
+        """
+        if self._stage1_saved or self._stage1_task is not None:
             return None
-
-        # first_name, secret_question, secret_answer
-        if not value:
-            return f"{step_def['prompt']} cannot be empty."
-        self.data[field] = value
+        self._stage1_task = _STAGE1_EXECUTOR.submit(
+            register_user,
+            self.data["user_id"],
+            self.data["first_name"],
+            "",                           # last_name — empty, updatable later
+            self.data["email"],
+            self.data["password"],
+            self.data["secret_question"],
+            self.data["secret_answer"],
+        )
         return None
 
-    def _validate_finance(self, step_def: Dict, value: str) -> Optional[str]:
-        field = step_def["field"]
-
-        if field == "monthly_income":
-            try:
-                amount = float(value.replace("$", "").replace(",", ""))
-                if amount < 0:
-                    return "Income cannot be negative. Try again:"
-                self.data["monthly_income"] = round(amount, 2)
-                self.data["annual_income"] = round(amount * 12, 2)   # auto-derived
-                return None
-            except ValueError:
-                return "Please enter a valid dollar amount (e.g. 3500 or 3,500):"
-
-        if field == "risk_profile":
-            if value.lower() not in ("low", "moderate", "high"):
-                return "Please enter Low, Moderate, or High:"
-            self.data[field] = value.title()
+    def _reconcile_stage1(self, wait: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Collect the background Stage-1 result.  Returns an error reply (and
+        resets) if the insert failed, otherwise None.  With ``wait`` the call
+        blocks for up to ``_STAGE1_WAIT_S``; an insert still running after
+        that keeps all state and asks the user to confirm again, since it
+        may yet commit.
+        """
+        task = self._stage1_task
+        if task is None:
             return None
+        if not task.done():
+            if not wait:
+                return None
+            wait_futures((task,), timeout=_STAGE1_WAIT_S)
+            if not task.done():
+                _log.warning("Stage-1 save still running for user %s", self.data.get("user_id"))
+                return _RETRY_STILL_SAVING
+        self._stage1_task = None
 
-        # short_term / long_term — free text
-        if not value:
-            return f"{step_def['prompt']} cannot be empty."
-        self.data[field] = value
-        return None
-
-    # ── Save helpers ─────────────────────────────────────────────────────
-
-    def _save_stage1(self) -> Optional[Dict[str, Any]]:
-        """Insert user row immediately after auth steps complete."""
-        if self._stage1_saved:
-            return None
         try:
-            ok = register_user(
-                self.data["user_id"],
-                self.data["first_name"],
-                "",                           # last_name — empty, updatable later
-                self.data["email"],
-                self.data["password"],
-                self.data["secret_question"],
-                self.data["secret_answer"],
-            )
-            if not ok:
-                self.reset()
-                return self._reply(
-                    "error",
-                    "Could not create your account. The User ID or email may already "
-                    "be in use. Please restart and try different credentials.",
-                )
-            self._stage1_saved = True
-            return None
+            created = task.result()
         except Exception as exc:
-            print(f"[RegistrationAgent] Stage-1 save error: {exc}")
+            _log.error("Stage-1 save failed for user %s: %s", self.data.get("user_id"), exc)
             self.reset()
             return self._reply("error", "A database error occurred. Please try again later.")
-
-    def _save_stage2(self) -> Dict[str, Any]:
-        """Persist financial profile and initial plan on confirmation."""
-        try:
-            user_id = self.data["user_id"]
-
-            # Profile — income fields only
-            profile_data = {
-                k: self.data[k]
-                for k in ("monthly_income", "annual_income")
-                if k in self.data
-            }
-            if profile_data:
-                update_user_profile(user_id, **profile_data)
-
-            # Preferences — risk profile only
-            if "risk_profile" in self.data:
-                update_user_preferences(user_id, risk_profile=self.data["risk_profile"])
-
-            # Financial plan
-            plan_name = f"{self.data['first_name']}'s Financial Plan"
-            create_financial_plan(
-                user_id,
-                plan_name,
-                {"description": self.data.get("short_term", "")},
-                {"description": self.data.get("long_term", "")},
-            )
-
-            first_name = self.data["first_name"]
-            risk = self.data.get("risk_profile", "—")
-            monthly = self.data.get("monthly_income", 0)
+        if not created:
             self.reset()
-
             return self._reply(
-                "complete",
-                f"✅ Welcome aboard, {first_name}! Your CoFina account is ready.\n"
-                f"  • Financial plan  : {plan_name}\n"
-                f"  • Monthly income  : ${monthly:,.2f}\n"
-                f"  • Risk profile    : {risk}\n\n"
-                "You can update your full profile anytime — just ask me to "
-                "'update my profile'.",
-                user_id=user_id,
-                profile_complete=True,
+                "error",
+                "Could not create your account. The User ID or email may already "
+                "be in use. Please restart and try different credentials.",
             )
+        self._stage1_saved = True
+        return None
 
-        except Exception as exc:
-            print(f"[RegistrationAgent] Stage-2 save error: {exc}")
+    def _save_stage2(self) -> Dict[str, Any]:
+        """Persist financial profile and initial plan on confirmation."""
+        user_id = self.data["user_id"]
+        plan_name = f"{self.data['first_name']}'s Financial Plan"
+
+        # Profile (income), preferences (risk) and plan in one transaction;
+        # save_registration projects self.data onto each table's columns and
+        # reports failure by returning False rather than raising
+        ok = save_registration(
+            user_id,
+            profile=self.data,
+            preferences=self.data,
+            plan_name=plan_name,
+            short_term_goals={"description": self.data.get("short_term", "")},
+            long_term_goals={"description": self.data.get("long_term", "")},
+        )
+        if not ok:
+            _log.error("Stage-2 save failed for user %s", user_id)
             self.reset()
             return self._reply(
                 "error",
@@ -295,16 +370,39 @@ class RegistrationAgent:
                 "— please contact support if anything is missing.",
             )
 
+        first_name = self.data["first_name"]
+        risk = self.data.get("risk_profile", "—")
+        monthly = self.data.get("monthly_income", 0)
+        self.reset()
+
+        return self._reply(
+            "complete",
+            f"✅ Welcome aboard, {first_name}! Your CoFina account is ready.\n"
+            f"  • Financial plan  : {plan_name}\n"
+            f"  • Monthly income  : ${monthly:,.2f}\n"
+            f"  • Risk profile    : {risk}\n\n"
+            "You can update your full profile anytime — just ask me to "
+            "'update my profile'.",
+            user_id=user_id,
+            profile_complete=True,
+        )
+
     # ── Prompt helper ────────────────────────────────────────────────────
 
     def _prompt_current(self) -> Dict[str, Any]:
-        if self.step_index >= len(STEPS):
-            return self._save_stage2()
-        step_def = STEPS[self.step_index]
-        return self._reply("ask", step_def["prompt"], field=step_def["field"])
+        # confirm_all is the last step and is never advanced past, so
+        # step_index always names a real step here.
+        return _ASK_REPLIES[self.step_index]
 
     # ── Response factory ─────────────────────────────────────────────────
 
     @staticmethod
-    def _reply(action: str, message: str, **data_kwargs) -> Dict[str, Any]:
-        return {"action": action, "message": message, "data": data_kwargs}
\ No newline at end of file
+    def _reply(
+        action: str, message: str, data: Optional[Dict[str, Any]] = None, **data_kwargs
+    ) -> Dict[str, Any]:
+        """Pass a pre-built ``data`` dict to skip keyword packing on hot paths."""
+        return {
+            "action":  action,
+            "message": message,
+            "data":    data if data is not None else data_kwargs,
+        }
\ No newline at end of file
@@ -3,11 +3,46 @@ Summarizer Agent - Summarizes long contexts while preserving key information
 """
 
 from typing import Dict, Any, List, Optional
+import functools
 import json
 import re
+import numpy as np
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
+# Key-information patterns, compiled once.  Entity and action captures are
+# length-capped so a long pasted email or log without periods cannot turn
+# into one huge match; _KEY_INFO_MAX_CHARS bounds the scan itself.
+_KEY_INFO_MAX_CHARS = 200_000
+_NUMBER_RE = re.compile(r'\$?\d+(?:,\d{3})*(?:\.\d+)?%?')               # incl. currency
+_DATE_RE   = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2}')
+_ENTITY_RE = re.compile(r'\b[A-Z][a-z]{1,30}(?:\s+[A-Z][a-z]{1,30}){0,6}\b')  # capitalized words
+_ACTION_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(?:should|must|need to|will|plan to) ([^\.]{1,300})',
+    r'action item[s]?:? ([^\.]{1,300})',
+    r'next step[s]?:? ([^\.]{1,300})',
+))
+
+# Sentence-scoring patterns for the extractive fallback
+_MONEY_RE    = re.compile(r'\$\d+')
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+_ADVICE_RE   = re.compile(r'should|must|need|important', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=4)
+def _make_llm(api_key: str, model: str = "gemini-2.5-flash") -> ChatOpenAI:
+    """One client (and HTTP connection pool) per key, shared by all summarizers."""
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url='https://ai-gateway.andrew.cmu.edu/',
+        temperature=0.1,
+        # Summaries are best-effort (callers fall back to raw text) and may
+        # run on a worker the interpreter joins at exit — never wait long.
+        timeout=10,
+        max_retries=1,
+    )
+
 class SummarizerAgent:
     """
     Specialized agent for summarizing long contexts and documents
@@ -15,14 +50,7 @@ class SummarizerAgent:
     
     def __init__(self, api_key: str = None):
         self.api_key = api_key
-        self.llm = None
-        if api_key:
-            self.llm = ChatOpenAI(
-                model="gemini-2.5-flash",
-                api_key=api_key,
-                base_url='https://ai-gateway.andrew.cmu.edu/',
-                temperature=0.1
-            )
+        self.llm = _make_llm(api_key) if api_key else None
     
     def process(self, text: str, max_length: int = 1000, 
                 preserve_keys: List[str] = None) -> Dict[str, Any]:
@@ -74,29 +102,20 @@ class SummarizerAgent:
             "entities": [],
             "action_items": []
         }
+        text = text[:_KEY_INFO_MAX_CHARS]
         
         # Extract numbers (including currency)
-        number_pattern = r'\$?\d+(?:,\d{3})*(?:\.\d+)?%?'
-        key_info["numbers"] = re.findall(number_pattern, text)
+        key_info["numbers"] = _NUMBER_RE.findall(text)
         
         # Extract dates
-        date_pattern = r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2}'
-        key_info["dates"] = re.findall(date_pattern, text)
+        key_info["dates"] = _DATE_RE.findall(text)
         
         # Extract potential entities (capitalized words)
-        entity_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        key_info["entities"] = list(set(re.findall(entity_pattern, text)))
+        key_info["entities"] = list(set(_ENTITY_RE.findall(text)))
         
         # Look for action items
-        action_patterns = [
-            r'(?:should|must|need to|will|plan to) ([^\.]+)',
-            r'action item[s]?:? ([^\.]+)',
-            r'next step[s]?:? ([^\.]+)'
-        ]
-        
-        for pattern in action_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            key_info["action_items"].extend(matches)
+        for pattern in _ACTION_RES:
+            key_info["action_items"].extend(pattern.findall(text))
         
         # Filter based on preserve_keys if provided
         if preserve_keys:
@@ -151,25 +170,20 @@ class SummarizerAgent:
             return text
         
         # Score sentences by importance (position + keyword density)
-        scored_sentences = []
-        for i, sentence in enumerate(sentences):
-            score = 1.0 / (i + 1)  # Earlier sentences more important
-            
-            # Boost sentences with key information
-            if re.search(r'\$\d+', sentence):  # Has money
-                score *= 1.5
-            if re.search(r'\d{4}-\d{2}-\d{2}', sentence):  # Has date
-                score *= 1.3
-            if re.search(r'should|must|need|important', sentence.lower()):
-                score *= 1.2
-            
-            scored_sentences.append((score, sentence))
-        
-        # Sort by score and select until max_length
-        scored_sentences.sort(reverse=True)
+        n = len(sentences)
+        scores = 1.0 / np.arange(1, n + 1)  # Earlier sentences more important
+        
+        # Boost sentences with key information
+        scores *= np.where(self._matches(_MONEY_RE, sentences), 1.5, 1.0)     # Has money
+        scores *= np.where(self._matches(_ISO_DATE_RE, sentences), 1.3, 1.0)  # Has date
+        scores *= np.where(self._matches(_ADVICE_RE, sentences), 1.2, 1.0)
+        
+        # Highest score first (ties keep sentence order) and select until max_length
+        order = np.argsort(-scores, kind="stable")
         
         summary = ""
-        for _, sentence in scored_sentences:
+        for idx in order:
+            sentence = sentences[idx]
             if len(summary) + len(sentence) <= max_length:
                 if summary:
                     summary += ". "
@@ -179,6 +193,14 @@ class SummarizerAgent:
         
         return summary
     
+    @staticmethod
+    def _matches(pattern: "re.Pattern", sentences: List[str]) -> np.ndarray:
+        """Boolean mask: which sentences contain ``pattern``."""
+        return np.fromiter(
+            (pattern.search(s) is not None for s in sentences),
+            dtype=bool, count=len(sentences),
+        )
+    
     def summarize_conversation(self, conversation: List[Dict], 
                                 max_turns: int = 5) -> Dict[str, Any]:
         """
@@ -251,15 +273,19 @@ class SummarizerAgent:
         ratio = token_limit / current_tokens
         target_length = int(len(text) * ratio * 0.9)  # Slightly conservative
         
-        # Try to truncate at sentence boundaries
-        sentences = text.split('. ')
-        truncated = ""
-        for sentence in sentences:
-            if len(truncated) + len(sentence) <= target_length:
-                if truncated:
-                    truncated += ". "
-                truncated += sentence
-            else:
-                break
-        
-        return truncated
\ No newline at end of file
+        # Keep the longest prefix of whole sentences that fits.  The ". "
+        # between sentences is not charged against the budget, so a later
+        # sentence may end up to 2 chars past it; leading empty sentences
+        # (text opening with ". ") are dropped.
+        start = 0
+        while text.startswith('. ', start):
+            start += 2
+        first_end = text.find('. ', start)
+        if first_end < 0:
+            first_end = len(text)
+        if first_end - start > target_length:
+            return ""
+        limit = start + target_length + 2
+        if len(text) <= limit:
+            return text[start:]
+        return text[start:text.rfind('. ', first_end, limit + 2)]
\ No newline at end of file
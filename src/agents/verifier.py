@@ -11,6 +11,7 @@ The verifier is GENEROUS — it understands that financial agents should be
 helpful, and only penalizes responses that are demonstrably wrong or harmful.
 """
 
+import functools
 from typing import Dict, Any
 
 from langchain_core.output_parsers import JsonOutputParser
@@ -32,37 +33,12 @@ class VerificationResult(BaseModel):
     )
 
 
-def verify_response(
-    question: str,
-    answer: str,
-    context: str,
-    api_key: str,
-) -> Dict[str, Any]:
-    """
-    Verify answer groundedness against retrieved context.
-
-    Args:
-        question: User's query
-        answer: Agent's response
-        context: RAG-retrieved context (or empty if none)
-        api_key: LLM API key
+_PARSER = JsonOutputParser(pydantic_object=VerificationResult)
 
-    Returns:
-        {"score": float, "reason": str, "action": str}
-        Falls back to {"score": 0.85, "action": "accept"} on LLM errors.
-    """
-    llm = ChatOpenAI(
-        model="gemini-2.5-flash",
-        api_key=api_key,
-        base_url="https://ai-gateway.andrew.cmu.edu/",
-        temperature=0.0,
-        timeout=10,
-    )
-
-    parser = JsonOutputParser(pydantic_object=VerificationResult)
-
-    prompt = ChatPromptTemplate.from_template(
-        """You are a quality judge for a financial assistant.
+# Built once; the format instructions are constant, so they are bound up
+# front instead of being regenerated from the schema on every call.
+_PROMPT = ChatPromptTemplate.from_template(
+    """You are a quality judge for a financial assistant.
 
 Score the ANSWER on how well it addresses the QUESTION, using the CONTEXT if provided.
 
@@ -99,14 +75,46 @@ DECISION:
 {format_instructions}
 
 Output JSON only, no extra text."""
+).partial(format_instructions=_PARSER.get_format_instructions())
+
+
+@functools.lru_cache(maxsize=4)
+def _get_chain(api_key: str):
+    """prompt | llm | parser, one per API key."""
+    llm = ChatOpenAI(
+        model="gemini-2.5-flash",
+        api_key=api_key,
+        base_url="https://ai-gateway.andrew.cmu.edu/",
+        temperature=0.0,
+        timeout=10,
     )
+    return _PROMPT | llm | _PARSER
 
+
+def verify_response(
+    question: str,
+    answer: str,
+    context: str,
+    api_key: str,
+) -> Dict[str, Any]:
+    """
+    Verify answer groundedness against retrieved context.
+
+    Args:
+        question: User's query
+        answer: Agent's response
+        context: RAG-retrieved context (or empty if none)
+        api_key: LLM API key
+
+    Returns:
+        {"score": float, "reason": str, "action": str}
+        Falls back to {"score": 0.85, "action": "accept"} on LLM errors.
+    """
     try:
-        result = (prompt | llm | parser).invoke({
+        result = _get_chain(api_key).invoke({
             "question": question,
             "context": context.strip() or "No specific context — general knowledge",
             "answer": answer,
-            "format_instructions": parser.get_format_instructions(),
         })
         # Clamp score to valid range
         result["score"] = max(0.0, min(1.0, float(result["score"])))
@@ -182,6 +182,11 @@ class CoFinaInterface:
         print(f"{dim}│{reset} ⏱  {green}{elapsed_ms} ms{reset}")
         print(f"{dim}└{'─' * 57}{reset}\n")
 
+    def print_verification(self, item: dict):
+        """Print a background verification badge once it has finished."""
+        if item.get("badge"):
+            print(self.c(f"  {item['badge']} — turn {item['turn_number']}", 'dim'))
+
     def print_help(self):
         commands = [
             ("exit / quit", "Exit CoFina"),
@@ -293,91 +298,21 @@ class CoFinaInterface:
 
 class InstrumentedOrchestrator(CoFinaOrchestrator):
     """
-    Thin subclass that overrides _tool_loop to print ORDAEU stage blocks
-    for every tool call without touching any core orchestrator logic.
+    Thin subclass that overrides the tool-call hooks to print ORDAEU stage
+    blocks for every tool call without touching any core orchestrator logic.
     """
 
     def __init__(self, api_key: str, ui: CoFinaInterface) -> None:
         super().__init__(api_key)
         self._ui = ui
 
-    def _tool_loop(self, messages: list, user_query: str) -> str:
-        import json, traceback
-        from langchain_core.messages import ToolMessage
-
-        tool_map  = {t.name: t for t in self.tools}
-        max_turns = 4
-
-        for _ in range(max_turns):
-            try:
-                llm_response = self.llm_with_tools.invoke(messages)
-                messages.append(llm_response)
-                tool_calls = getattr(llm_response, "tool_calls", None) or []
-
-                if not tool_calls:
-                    final = llm_response.content
-                    self._append_history(user_query, final)
-                    return final
-
-                for call in tool_calls:
-                    name    = call.get("name")
-                    args    = call.get("args", {})
-                    call_id = call.get("id")
-
-                    # ── ORDAEU stage display ──────────────────────────────
-                    stage, agent = _TOOL_STAGE_MAP.get(
-                        name, ("ACT", "Execution Agent")
-                    )
-                    self._ui.print_ordaeu_stage(stage, agent)
-                    self._ui.print_tool_call(name, args)
-                    # ─────────────────────────────────────────────────────
-
-                    self.logger.log_step("tool_call", {"tool": name, "args": args})
-
-                    fn = tool_map.get(name)
-                    t0 = time.perf_counter()
-                    if fn:
-                        try:
-                            result = fn.invoke(args)
-                            success = True
-                            try:
-                                parsed  = json.loads(result) if isinstance(result, str) else result
-                                success = not ("error" in parsed or parsed.get("success") is False)
-                                self.evaluator.log_tool_call(self.current_session_id, name, success)
-                            except Exception:
-                                pass
-                        except Exception as exc:
-                            result  = json.dumps({"error": str(exc)})
-                            success = False
-                            self.evaluator.log_tool_call(self.current_session_id, name, False)
-                    else:
-                        result  = json.dumps({"error": f"Unknown tool: {name}"})
-                        success = False
-                        self.evaluator.log_tool_call(self.current_session_id, name, False)
-
-                    elapsed_ms = round((time.perf_counter() - t0) * 1000)
+    def _on_tool_start(self, name: str, args: dict) -> None:
+        stage, agent = _TOOL_STAGE_MAP.get(name, ("ACT", "Execution Agent"))
+        self._ui.print_ordaeu_stage(stage, agent)
+        self._ui.print_tool_call(name, args)
 
-                    # ── Print result + timing ─────────────────────────────
-                    self._ui.print_tool_result(str(result), elapsed_ms)
-                    # ─────────────────────────────────────────────────────
-
-                    messages.append(ToolMessage(content=str(result), tool_call_id=call_id))
-
-                    try:
-                        parsed = json.loads(result)
-                        self._handle_registration_result(parsed)
-                    except Exception:
-                        pass
-
-            except Exception as exc:
-                error_msg = f"Processing error: {exc}"
-                print(traceback.format_exc())
-                self.logger.log_step("error", error_msg)
-                return f"I encountered an error: {error_msg}"
-
-        last_content = getattr(messages[-1], "content", "I need more information to help you.")
-        self._append_history(user_query, last_content)
-        return last_content
+    def _on_tool_end(self, name: str, content: str, elapsed_ms: int) -> None:
+        self._ui.print_tool_result(content, elapsed_ms)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -476,6 +411,11 @@ def main():
 
             ui.show_response(response)
 
+            # Background verifications (this turn's or earlier ones) that
+            # have finished by now
+            for item in orchestrator.get_pending_verifications():
+                ui.print_verification(item)
+
             # Periodic checkpoint every 5 turns
             orchestrator.turn_count += 1
             if orchestrator.turn_count % 5 == 0:
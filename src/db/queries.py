@@ -7,11 +7,15 @@ Callers should never need to import sqlite3 directly.
 
 from __future__ import annotations
 
+import functools
 import json
 import os
+import re
 import sqlite3
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import bcrypt
 
@@ -29,18 +33,86 @@ def get_connection() -> sqlite3.Connection:
 # Authentication
 # ═══════════════════════════════════════════════════════════════════
 
+def _memoize_hits(maxsize: int) -> Callable[[Callable[[str], bool]], Callable[[str], bool]]:
+    """
+    Memoize a one-argument existence probe, keeping only its True answers
+    (least recently used dropped past ``maxsize``).  A False answer can go
+    stale as soon as the other process sharing cofina.db inserts a row, so
+    it is always asked again.
+    """
+    def decorator(probe: Callable[[str], bool]) -> Callable[[str], bool]:
+        hits: "OrderedDict[str, None]" = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(probe)
+        def wrapper(key: str) -> bool:
+            with lock:
+                if key in hits:
+                    hits.move_to_end(key)
+                    return True
+            if not probe(key):
+                return False
+            with lock:
+                hits[key] = None
+                if len(hits) > maxsize:
+                    hits.popitem(last=False)
+            return True
+
+        def cache_clear() -> None:
+            with lock:
+                hits.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+# Existence probes are memoized so the registration retry loop (re-typing a
+# taken user_id / email) doesn't re-query.  Every write that adds or removes
+# a user row calls _clear_existence_caches().
+@_memoize_hits(maxsize=256)
 def user_exists(user_id: str) -> bool:
     with get_connection() as conn:
         cur = conn.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,))
         return cur.fetchone() is not None
 
 
+@_memoize_hits(maxsize=256)
 def email_exists(email: str) -> bool:
     with get_connection() as conn:
         cur = conn.execute("SELECT 1 FROM users WHERE email = ?", (email,))
         return cur.fetchone() is not None
 
 
+def _clear_existence_caches() -> None:
+    user_exists.cache_clear()
+    email_exists.cache_clear()
+
+
+# In-process snapshot of taken user_ids, loaded on first use and kept in step
+# by register_user / delete_user_data.  A miss means "free" without touching
+# the DB; a hit is confirmed with user_exists() in case the row was removed
+# elsewhere.  Ids inserted since by the other process sharing cofina.db (CLI
+# and web server) are caught by the UNIQUE constraint in register_user, which
+# the stage-1 reconcile reports, and the snapshot is then reloaded.
+# register_user may drop the snapshot from a worker thread, so readers take
+# one local reference.
+_known_user_ids: Optional[set] = None
+
+
+def load_all_user_ids() -> set:
+    with get_connection() as conn:
+        return {row[0] for row in conn.execute("SELECT user_id FROM users")}
+
+
+def user_id_taken(user_id: str) -> bool:
+    global _known_user_ids
+    known = _known_user_ids
+    if known is None:
+        known = _known_user_ids = load_all_user_ids()
+    return user_id in known and user_exists(user_id)
+
+
 def register_user(
     user_id: str,
     first_name: str,
@@ -54,6 +126,7 @@ def register_user(
     Insert a new user row.  Passwords and secret answers are bcrypt-hashed.
     Returns True on success, False if the user_id or email already exists.
     """
+    global _known_user_ids
     pwd_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
     ans_hash = bcrypt.hashpw(
         secret_answer.lower().strip().encode(), bcrypt.gensalt()
@@ -71,8 +144,14 @@ def register_user(
                  pwd_hash, secret_question, ans_hash),
             )
             conn.commit()
+            _clear_existence_caches()
+            if _known_user_ids is not None:
+                _known_user_ids.add(user_id)
             return True
         except sqlite3.IntegrityError as exc:
+            # Another writer took the id/email — drop any stale "free" answers
+            _known_user_ids = None
+            _clear_existence_caches()
             print(f"[register_user] IntegrityError: {exc}")
             return False
 
@@ -93,6 +172,36 @@ def verify_login(user_id: str, password: str) -> bool:
         return False
 
 
+def login_and_fetch(user_id: str, password: str) -> Dict[str, Any]:
+    """
+    Check existence, verify the password and fetch the basic user row in a
+    single query.  Returns {"exists": bool, "verified": bool, "profile": dict|None};
+    "profile" is only populated when the password is correct.
+    """
+    with get_connection() as conn:
+        cur = conn.execute(
+            """
+            SELECT user_id, first_name, other_names, email, created_at, last_login,
+                   password_hash
+            FROM users WHERE user_id = ?
+            """,
+            (user_id,),
+        )
+        row = cur.fetchone()
+        if not row:
+            return {"exists": False, "verified": False, "profile": None}
+        if not bcrypt.checkpw(password.encode(), row["password_hash"]):
+            return {"exists": True, "verified": False, "profile": None}
+        conn.execute(
+            "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE user_id = ?",
+            (user_id,),
+        )
+        conn.commit()
+        profile = dict(row)
+        del profile["password_hash"]
+        return {"exists": True, "verified": True, "profile": profile}
+
+
 def get_secret_question(user_id: str) -> Optional[str]:
     with get_connection() as conn:
         cur = conn.execute(
@@ -204,25 +313,47 @@ def get_user_profile(user_id: str) -> Optional[Dict[str, Any]]:
         return result
 
 
+# Writable columns; anything else in a caller's kwargs is ignored, so callers
+# can pass a whole form dict without pre-filtering it.
+_PROFILE_COLUMNS = frozenset((
+    "profession", "current_role", "employment_start_date", "age", "gender",
+    "civil_status", "number_of_children", "monthly_income", "annual_income",
+    "retirement_age_target", "estimated_retirement_date",
+))
+_PREFERENCE_COLUMNS = frozenset((
+    "risk_profile", "debt_strategy", "savings_priority", "investment_horizon",
+))
+
+
+def _writable(fields: Dict[str, Any], columns: frozenset) -> Dict[str, Any]:
+    """Keep only known, non-None columns."""
+    return {k: v for k, v in fields.items() if v is not None and k in columns}
+
+
+def _upsert_user_row(conn: sqlite3.Connection, table: str, user_id: str, fields: Dict[str, Any]) -> None:
+    """INSERT ... ON CONFLICT(user_id) DO UPDATE for user_profiles / user_preferences."""
+    columns = list(fields.keys())
+    values = list(fields.values())
+    set_clause = ", ".join(f"{c} = ?" for c in columns)
+    conn.execute(
+        f"""
+        INSERT INTO {table} (user_id, {', '.join(columns)})
+        VALUES (?, {', '.join('?' * len(columns))})
+        ON CONFLICT(user_id) DO UPDATE SET
+            {set_clause}, updated_at = CURRENT_TIMESTAMP
+        """,
+        [user_id] + values + values,
+    )
+
+
 def update_user_profile(user_id: str, **kwargs) -> bool:
-    """Upsert profile fields.  Only non-None kwargs are written."""
-    valid = {k: v for k, v in kwargs.items() if v is not None}
+    """Upsert profile fields.  Only known, non-None kwargs are written."""
+    valid = _writable(kwargs, _PROFILE_COLUMNS)
     if not valid:
         return True
-    columns = list(valid.keys())
-    values = list(valid.values())
-    set_clause = ", ".join(f"{c} = ?" for c in columns)
     try:
         with get_connection() as conn:
-            conn.execute(
-                f"""
-                INSERT INTO user_profiles (user_id, {', '.join(columns)})
-                VALUES (?, {', '.join('?' * len(columns))})
-                ON CONFLICT(user_id) DO UPDATE SET
-                    {set_clause}, updated_at = CURRENT_TIMESTAMP
-                """,
-                [user_id] + values + values,
-            )
+            _upsert_user_row(conn, "user_profiles", user_id, valid)
             conn.commit()
             return True
     except Exception as exc:
@@ -235,24 +366,13 @@ def update_user_profile(user_id: str, **kwargs) -> bool:
 # ═══════════════════════════════════════════════════════════════════
 
 def update_user_preferences(user_id: str, **kwargs) -> bool:
-    """Upsert preference fields."""
-    valid = {k: v for k, v in kwargs.items() if v is not None}
+    """Upsert preference fields.  Only known, non-None kwargs are written."""
+    valid = _writable(kwargs, _PREFERENCE_COLUMNS)
     if not valid:
         return True
-    columns = list(valid.keys())
-    values = list(valid.values())
-    set_clause = ", ".join(f"{c} = ?" for c in columns)
     try:
         with get_connection() as conn:
-            conn.execute(
-                f"""
-                INSERT INTO user_preferences (user_id, {', '.join(columns)})
-                VALUES (?, {', '.join('?' * len(columns))})
-                ON CONFLICT(user_id) DO UPDATE SET
-                    {set_clause}, updated_at = CURRENT_TIMESTAMP
-                """,
-                [user_id] + values + values,
-            )
+            _upsert_user_row(conn, "user_preferences", user_id, valid)
             conn.commit()
             return True
     except Exception as exc:
@@ -264,27 +384,24 @@ def update_user_preferences(user_id: str, **kwargs) -> bool:
 # Debts
 # ═══════════════════════════════════════════════════════════════════
 
+_DEBT_COLUMNS = (
+    "debt_type", "creditor", "total_amount",
+    "remaining_amount", "interest_rate", "minimum_payment", "due_date",
+)
+_INSERT_DEBT_SQL = f"""
+    INSERT INTO user_debts (user_id, {', '.join(_DEBT_COLUMNS)})
+    VALUES (?, {', '.join('?' * len(_DEBT_COLUMNS))})
+"""
+
+
+def _debt_row(user_id: str, debt_data: Dict[str, Any]) -> tuple:
+    return (user_id, *(debt_data.get(c) for c in _DEBT_COLUMNS))
+
+
 def add_user_debt(user_id: str, debt_data: Dict[str, Any]) -> bool:
     try:
         with get_connection() as conn:
-            conn.execute(
-                """
-                INSERT INTO user_debts
-                    (user_id, debt_type, creditor, total_amount,
-                     remaining_amount, interest_rate, minimum_payment, due_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    user_id,
-                    debt_data.get("debt_type"),
-                    debt_data.get("creditor"),
-                    debt_data.get("total_amount"),
-                    debt_data.get("remaining_amount"),
-                    debt_data.get("interest_rate"),
-                    debt_data.get("minimum_payment"),
-                    debt_data.get("due_date"),
-                ),
-            )
+            conn.execute(_INSERT_DEBT_SQL, _debt_row(user_id, debt_data))
             conn.commit()
             return True
     except Exception as exc:
@@ -319,6 +436,37 @@ def update_debt_status(debt_id: int, status: str) -> bool:
 # Financial plans
 # ═══════════════════════════════════════════════════════════════════
 
+def _insert_financial_plan(
+    conn: sqlite3.Connection,
+    user_id: str,
+    plan_name: str,
+    short_term_goals: Dict,
+    long_term_goals: Dict,
+    plan_type: str,
+) -> None:
+    # Archive previous active plan
+    conn.execute(
+        """
+        UPDATE financial_plans SET status = 'archived'
+        WHERE user_id = ? AND status = 'active'
+        """,
+        (user_id,),
+    )
+    conn.execute(
+        """
+        INSERT INTO financial_plans
+            (user_id, plan_name, plan_type,
+             short_term_goals, long_term_goals, status)
+        VALUES (?, ?, ?, ?, ?, 'active')
+        """,
+        (
+            user_id, plan_name, plan_type,
+            json.dumps(short_term_goals),
+            json.dumps(long_term_goals),
+        ),
+    )
+
+
 def create_financial_plan(
     user_id: str,
     plan_name: str,
@@ -328,26 +476,8 @@ def create_financial_plan(
 ) -> bool:
     try:
         with get_connection() as conn:
-            # Archive previous active plan
-            conn.execute(
-                """
-                UPDATE financial_plans SET status = 'archived'
-                WHERE user_id = ? AND status = 'active'
-                """,
-                (user_id,),
-            )
-            conn.execute(
-                """
-                INSERT INTO financial_plans
-                    (user_id, plan_name, plan_type,
-                     short_term_goals, long_term_goals, status)
-                VALUES (?, ?, ?, ?, ?, 'active')
-                """,
-                (
-                    user_id, plan_name, plan_type,
-                    json.dumps(short_term_goals),
-                    json.dumps(long_term_goals),
-                ),
+            _insert_financial_plan(
+                conn, user_id, plan_name, short_term_goals, long_term_goals, plan_type
             )
             conn.commit()
             return True
@@ -389,6 +519,47 @@ def update_plan_status(plan_id: int, status: str) -> bool:
         return True
 
 
+# ═══════════════════════════════════════════════════════════════════
+# Registration
+# ═══════════════════════════════════════════════════════════════════
+
+def save_registration(
+    user_id: str,
+    profile: Dict[str, Any],
+    preferences: Dict[str, Any],
+    plan_name: str,
+    short_term_goals: Dict,
+    long_term_goals: Dict,
+    debts: Optional[List[Dict[str, Any]]] = None,
+    plan_type: str = "Comprehensive",
+) -> bool:
+    """
+    Persist the finance stage of registration — profile, preferences, debts
+    and the initial plan — in one transaction with a single commit.
+    Nothing is written if any statement fails.  ``profile`` and
+    ``preferences`` may be the same dict; each is projected onto its
+    table's columns.
+    """
+    profile = _writable(profile, _PROFILE_COLUMNS)
+    preferences = _writable(preferences, _PREFERENCE_COLUMNS)
+    try:
+        with get_connection() as conn:
+            if profile:
+                _upsert_user_row(conn, "user_profiles", user_id, profile)
+            if preferences:
+                _upsert_user_row(conn, "user_preferences", user_id, preferences)
+            if debts:
+                conn.executemany(_INSERT_DEBT_SQL, [_debt_row(user_id, d) for d in debts])
+            _insert_financial_plan(
+                conn, user_id, plan_name, short_term_goals, long_term_goals, plan_type
+            )
+            conn.commit()
+            return True
+    except Exception as exc:
+        print(f"[save_registration] {exc}")
+        return False
+
+
 # ═══════════════════════════════════════════════════════════════════
 # Transactions
 # ═══════════════════════════════════════════════════════════════════
@@ -455,6 +626,17 @@ def log_agent_decision(
 # Utility
 # ═══════════════════════════════════════════════════════════════════
 
+_YMD_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+
+
+def _parse_ymd(value: str) -> datetime:
+    """Strict YYYY-MM-DD parse without strptime; raises ValueError if invalid."""
+    match = _YMD_RE.match(value)
+    if not match:
+        raise ValueError(f"not a YYYY-MM-DD date: {value!r}")
+    return datetime(*map(int, match.groups()))  # rejects month 13, Feb 30, ...
+
+
 def calculate_retirement_date(
     employment_start: str, target_age: int, current_age: int
 ) -> str:
@@ -462,7 +644,7 @@ def calculate_retirement_date(
     try:
         years_left = max(target_age - current_age, 0)
         retirement_year = datetime.now().year + years_left
-        start = datetime.strptime(employment_start, "%Y-%m-%d")
+        start = _parse_ymd(employment_start)
         return datetime(retirement_year, start.month, start.day).strftime("%Y-%m-%d")
     except Exception:
         return f"{datetime.now().year + 30}-01-01"
@@ -514,4 +696,7 @@ def delete_user_data(user_id: str) -> bool:
         conn.execute("DELETE FROM user_profiles WHERE user_id = ?", (user_id,))
         conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
         conn.commit()
-        return True
\ No newline at end of file
+    if _known_user_ids is not None:
+        _known_user_ids.discard(user_id)
+    _clear_existence_caches()
+    return True
\ No newline at end of file
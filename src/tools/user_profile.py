@@ -26,41 +26,9 @@ def get_user_profile(user_id: str) -> Optional[Dict[str, Any]]:
     return db_get_profile(user_id)
 
 def update_user_profile(user_id: str, **kwargs) -> bool:
-    """Update user profile information."""
-    if not kwargs:
-        return True
-    
-    # Filter out None values
-    valid_kwargs = {k: v for k, v in kwargs.items() if v is not None}
-    
-    if not valid_kwargs:
-        return True
-    
-    with get_connection() as conn:
-        try:
-            # Check if profile exists
-            cur = conn.execute("SELECT 1 FROM user_profiles WHERE user_id = ?", (user_id,))
-            exists = cur.fetchone() is not None
-            
-            if exists:
-                # Update existing profile
-                set_clause = ", ".join([f"{k} = ?" for k in valid_kwargs.keys()])
-                values = list(valid_kwargs.values()) + [user_id]
-                query = f"UPDATE user_profiles SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?"
-                conn.execute(query, values)
-            else:
-                # Insert new profile
-                columns = ", ".join(['user_id'] + list(valid_kwargs.keys()))
-                placeholders = ", ".join(['?'] + ['?'] * len(valid_kwargs))
-                values = [user_id] + list(valid_kwargs.values())
-                query = f"INSERT INTO user_profiles ({columns}) VALUES ({placeholders})"
-                conn.execute(query, values)
-            
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Profile update error: {e}")
-            return False
+    """Update user profile information (unknown or None fields are ignored)"""
+    from db.queries import update_user_profile as db_update_profile
+    return db_update_profile(user_id, **kwargs)
 
 def update_user_preferences(
     user_id: str,
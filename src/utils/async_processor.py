@@ -117,7 +117,7 @@ class AsyncProcessor:
         Returns:
             task_id: Unique task identifier
         """
-        task_id = str(uuid.uuid4())
+        task_id = uuid.uuid4().hex
         self.task_queue.put((task_id, func, args, kwargs, timeout))
         self.status[task_id] = "queued"
         return task_id
@@ -143,6 +143,13 @@ class AsyncProcessor:
         
         return self.results.get(task_id)
     
+    def pop_result(self, task_id: str) -> Optional[Any]:
+        """Return a finished task's result and forget the task (None if not ready)"""
+        result = self.results.pop(task_id, None)
+        if result is not None:
+            self.status.pop(task_id, None)
+        return result
+    
     def get_status(self, task_id: str) -> str:
         """Get status of a task"""
         return self.status.get(task_id, "unknown")
@@ -5,11 +5,13 @@ Logger for CoFina - Ensures trace logs are saved properly
 import json
 import os
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from pathlib import Path
 
 class AgentLogger:
-    def __init__(self, log_dir: str = "logs"):
+    def __init__(self, log_dir: str = "logs", level: Optional[str] = None):
+        # DEBUG enables verbose per-tool traces; set via the DEBUG env var by default
+        self.level = (level or ("DEBUG" if os.getenv("DEBUG") else "INFO")).upper()
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         
@@ -32,15 +34,27 @@ class AgentLogger:
             "timestamp": datetime.now().isoformat()
         })
     
-    def log_step(self, step_type: str, content: Any):
+    def log_step(self, step_type: str, content: Any, turn_id: Optional[str] = None):
+        # Background work passes the turn_id it captured, since by the time
+        # it logs the current turn may have ended or moved on.
         self._write_entry({
             "event": "step",
-            "turn_id": self.current_turn_id,
+            "turn_id": turn_id or self.current_turn_id,
             "step_type": step_type,
             "content": content,
             "timestamp": datetime.now().isoformat()
         })
     
+    def is_debug(self) -> bool:
+        return self.level == "DEBUG"
+    
+    def debug(self, step_type: str, content: Any):
+        """Log a debug-only step. `content` may be a zero-arg callable so the
+        formatting work is skipped entirely when debug logging is off."""
+        if not self.is_debug():
+            return
+        self.log_step(step_type, content() if callable(content) else content)
+    
     def log_retrieval(self, query: str, chunks: list):
         sanitized = []
         for c in chunks:
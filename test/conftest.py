@@ -0,0 +1,12 @@
+"""
+Shared pytest setup: the application modules import each other as
+top-level packages (``from db.queries import ...``), so put ``src`` on
+the path the same way the CLI and UI server do.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
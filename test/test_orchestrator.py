@@ -0,0 +1,419 @@
+"""
+Orchestrator turn-handling tests.  The orchestrator is built bare (no
+gateway, RAG or database) and driven with scripted fake LLMs.
+"""
+
+import asyncio
+import gc
+import json
+import threading
+import time
+import weakref
+from collections import deque
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("langchain_core")
+pytest.importorskip("langchain_openai")
+
+import agents.orchestrator as orchestrator_mod
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from agents.orchestrator import CoFinaOrchestrator
+from utils.async_processor import get_async_processor
+from utils.logger import AgentLogger
+
+
+class _ScriptedLLM:
+    """Replays canned replies and records every call."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls   = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return self.replies.pop(0)
+
+    async def astream(self, messages):
+        self.calls += 1
+        reply = self.replies.pop(0)
+        chunks = [AIMessageChunk(content=w) for w in _words(reply.content) if w]
+        if reply.tool_calls:
+            chunks.append(AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(reply.tool_calls)
+                ],
+            ))
+        for chunk in chunks:
+            yield chunk
+
+
+def _words(text):
+    head, *rest = text.split(" ")
+    return [head] + [" " + w for w in rest]
+
+
+class _Tool:
+    def __init__(self, result):
+        self.result = result
+        self.args   = []
+
+    async def ainvoke(self, args):
+        self.args.append(args)
+        return self.result
+
+
+class _Evaluator:
+    def __init__(self):
+        self.verifications = []
+        self.tool_calls    = []
+
+    def log_verification(self, **kwargs):
+        self.verifications.append(kwargs)
+
+    def log_tool_call(self, session_id, name, success):
+        self.tool_calls.append((name, success))
+
+
+def _bare_orchestrator(tmp_path):
+    orch = object.__new__(CoFinaOrchestrator)
+    orch.api_key                = "test-key"
+    orch.logger                 = AgentLogger(log_dir=str(tmp_path))
+    orch.evaluator              = _Evaluator()
+    orch.turn_number            = 0
+    orch._retrievals            = []
+    orch.current_session_id     = "s1"
+    orch.current_user_id        = "guest"
+    orch._pending_verifications = []
+    orch._turn_verification     = None
+    orch.conversation_history   = deque(maxlen=orchestrator_mod._HISTORY_MAXLEN)
+    orch._history_summary       = ""
+    orch._summary_task          = None
+    orch.retriever              = None
+    orch._tool_slots            = asyncio.Semaphore(4)
+    orch._tool_map              = {}
+    return orch
+
+
+def _tool_turn(tmp_path, router, followup, answer):
+    orch = _bare_orchestrator(tmp_path)
+    orch.llm_with_tools = router
+    orch.followup_llm   = followup
+    orch.answer_llm     = answer
+    orch._tool_map["calculator"] = _Tool({"result": 42})
+    return orch
+
+
+_CALC_CALL = AIMessage(
+    content="", tool_calls=[{"name": "calculator", "args": {"expression": "6*7"}, "id": "c1"}]
+)
+_LONG_QUERY = "please work out six times seven and explain the result"
+
+
+def _log_steps(orch, step_type):
+    with open(orch.logger.log_file, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    return [e for e in entries if e.get("step_type") == step_type]
+
+
+def _wait_ready(task_id, timeout=5.0):
+    processor = get_async_processor()
+    deadline  = time.monotonic() + timeout
+    while not processor.is_ready(task_id):
+        assert time.monotonic() < deadline, "background task did not finish"
+        time.sleep(0.01)
+
+
+# ── Background verification ─────────────────────────────────────────────
+
+def test_verification_is_drained_and_logged_on_its_own_turn(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        orchestrator_mod, "verify_response",
+        lambda **kw: {"score": 0.9, "reason": "ok", "action": "accept"},
+    )
+    orch = _bare_orchestrator(tmp_path)
+
+    orch.logger.start_turn("what is an index fund exactly")
+    verified_turn = orch.logger.current_turn_id
+    orch._retrievals = [("[doc] index funds track an index", 12)]
+    orch._finish_turn("what is an index fund exactly", "An index fund ...")
+    task_id = orch._turn_verification
+
+    # A later turn is open by the time the worker logs
+    orch.logger.start_turn("next question")
+    _wait_ready(task_id)
+
+    drained = orch.get_pending_verifications()
+    assert [d["badge"] for d in drained] == ["✓ Verified (confidence: 90%)"]
+    assert orch.get_pending_verifications() == []
+    assert task_id not in get_async_processor().results
+
+    steps = _log_steps(orch, "verification")
+    assert [s["turn_id"] for s in steps] == [verified_turn]
+
+
+# ── Tool loop ───────────────────────────────────────────────────────────
+
+def test_tool_free_turn_uses_router_reply(tmp_path):
+    router, followup, answer = _ScriptedLLM(AIMessage(content="Hello!")), _ScriptedLLM(), _ScriptedLLM()
+    orch = _tool_turn(tmp_path, router, followup, answer)
+
+    reply = asyncio.run(orch._tool_loop([], "hi"))
+
+    assert reply == "Hello!"
+    assert (router.calls, followup.calls, answer.calls) == (1, 0, 0)
+
+
+@pytest.mark.parametrize("query", ["what is 6*7", _LONG_QUERY])
+def test_single_tool_round_costs_two_llm_calls(tmp_path, query):
+    router   = _ScriptedLLM(_CALC_CALL)
+    followup = _ScriptedLLM(AIMessage(content="It is 42."))
+    answer   = _ScriptedLLM(AIMessage(content="It is 42."))
+    orch = _tool_turn(tmp_path, router, followup, answer)
+
+    reply = asyncio.run(orch._tool_loop([], query))
+
+    assert reply == "It is 42."
+    assert router.calls + followup.calls + answer.calls == 2
+    assert orch._tool_map["calculator"].args == [{"expression": "6*7"}]
+    assert [m.content for m in orch.conversation_history] == [query, "It is 42."]
+
+
+def test_followup_model_can_request_more_tools(tmp_path):
+    second = AIMessage(
+        content="", tool_calls=[{"name": "calculator", "args": {"expression": "42+1"}, "id": "c2"}]
+    )
+    router   = _ScriptedLLM(_CALC_CALL)
+    followup = _ScriptedLLM(second, AIMessage(content="It is 43."))
+    answer   = _ScriptedLLM()
+    orch = _tool_turn(tmp_path, router, followup, answer)
+
+    reply = asyncio.run(orch._tool_loop([], _LONG_QUERY))
+
+    assert reply == "It is 43."
+    assert (router.calls, followup.calls, answer.calls) == (1, 2, 0)
+    assert len(orch._tool_map["calculator"].args) == 2
+
+
+def _stream(orch, query):
+    async def collect():
+        return [d async for d in orch._stream_tool_loop([], query)]
+    return asyncio.run(collect())
+
+
+def test_streamed_tool_round_costs_two_llm_calls(tmp_path):
+    router   = _ScriptedLLM(_CALC_CALL)
+    followup = _ScriptedLLM(AIMessage(content="It is 42."))
+    answer   = _ScriptedLLM()
+    orch = _tool_turn(tmp_path, router, followup, answer)
+
+    assert _stream(orch, _LONG_QUERY) == ["It is 42."]
+    assert (router.calls, followup.calls, answer.calls) == (1, 1, 0)
+
+
+def test_text_before_a_tool_call_is_not_streamed(tmp_path):
+    chatty = AIMessage(content="Let me calculate that.", tool_calls=_CALC_CALL.tool_calls)
+    final  = AIMessage(content="It is 42.")
+    streamed = _tool_turn(tmp_path, _ScriptedLLM(chatty), _ScriptedLLM(final), _ScriptedLLM())
+    plain    = _tool_turn(tmp_path, _ScriptedLLM(chatty), _ScriptedLLM(final), _ScriptedLLM())
+
+    deltas = _stream(streamed, _LONG_QUERY)
+
+    assert "".join(deltas) == asyncio.run(plain._tool_loop([], _LONG_QUERY)) == "It is 42."
+    assert streamed.conversation_history[-1].content == "It is 42."
+
+
+class _LoginTool:
+    def __init__(self, orch):
+        self.orch = orch
+
+    async def ainvoke(self, args):
+        await asyncio.sleep(0.01)
+        self.orch.current_user_id = args["user_id"]
+        return {"success": True}
+
+
+class _WhoAmITool:
+    def __init__(self, orch):
+        self.orch = orch
+        self.seen = []
+
+    async def ainvoke(self, args):
+        self.seen.append(self.orch.current_user_id)
+        return {"user_id": self.orch.current_user_id}
+
+
+def test_stateful_tools_run_before_readers_in_the_same_hop(tmp_path):
+    orch   = _bare_orchestrator(tmp_path)
+    whoami = _WhoAmITool(orch)
+    orch._tool_map.update(login_flow=_LoginTool(orch), get_my_profile=whoami)
+    calls = [
+        {"name": "get_my_profile", "args": {}, "id": "c1"},
+        {"name": "login_flow", "args": {"user_id": "alice42", "password": "x"}, "id": "c2"},
+        {"name": "get_my_profile", "args": {}, "id": "c3"},
+    ]
+    messages = []
+
+    asyncio.run(orch._run_tool_calls(messages, calls))
+
+    assert whoami.seen == ["alice42", "alice42"]
+    assert [m.tool_call_id for m in messages] == ["c1", "c2", "c3"]
+
+
+# ── History compaction ──────────────────────────────────────────────────
+
+class _GatedSummarizer:
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def process(self, text, max_length):
+        assert self.gate.wait(5)
+        return {"summary": f"summary of {text.count('User:')} turns"}
+
+
+def test_history_compaction_does_not_block_the_reply(tmp_path):
+    orch = _bare_orchestrator(tmp_path)
+    orch.summarizer_agent = _GatedSummarizer()
+    turns = orchestrator_mod._HISTORY_MAXLEN // 2
+
+    for i in range(turns):
+        orch._append_history(f"question {i}", f"answer {i}")
+
+    # Summarizer still gated: the reply path went on with the raw tail
+    assert len(orch.conversation_history) == orchestrator_mod._HISTORY_KEEP
+    assert orch._history_summary.endswith(f"Agent: answer {turns - 4}")
+    orch._apply_history_summary()
+    assert orch._summary_task is not None
+
+    orch.summarizer_agent.gate.set()
+    orch._summary_task[1].result(timeout=5)
+    orch._apply_history_summary()
+
+    folded = turns - orchestrator_mod._HISTORY_KEEP // 2
+    assert orch._history_summary == f"summary of {folded} turns"
+    assert orch._summary_task is None
+
+
+def test_history_summary_is_dropped_after_logout(tmp_path):
+    orch = _bare_orchestrator(tmp_path)
+    orch.summarizer_agent = _GatedSummarizer()
+    for i in range(orchestrator_mod._HISTORY_MAXLEN // 2):
+        orch._append_history(f"question {i}", f"answer {i}")
+
+    orch.current_session_id = "s2"
+    orch._history_summary   = ""
+    orch.summarizer_agent.gate.set()
+    orch._summary_task[1].result(timeout=5)
+    orch._apply_history_summary()
+
+    assert orch._history_summary == "" and orch._summary_task is None
+
+
+# ── Event loop lifetime ─────────────────────────────────────────────────
+
+def _looped_orchestrator(tmp_path):
+    orch = _bare_orchestrator(tmp_path)
+    orch._loop              = asyncio.new_event_loop()
+    orch._loop_lock         = threading.Lock()
+    orch._http_async_client = httpx.AsyncClient()
+    orch._finalizer         = weakref.finalize(
+        orch, orchestrator_mod._close_loop, orch._loop, orch._http_async_client
+    )
+    return orch
+
+
+def test_dropped_orchestrator_is_collected_and_closed(tmp_path):
+    orch = _looped_orchestrator(tmp_path)
+    loop, ref = orch._loop, weakref.ref(orch)
+
+    del orch
+    gc.collect()
+
+    assert ref() is None
+    assert loop.is_closed()
+
+
+def test_abandoned_stream_does_not_block_other_calls(tmp_path):
+    orch = _looped_orchestrator(tmp_path)
+
+    async def astream(query):
+        for word in ("one", "two", "three"):
+            yield word
+
+    async def aprocess(query):
+        return "answered"
+
+    orch.astream_process = astream
+    orch.aprocess        = aprocess
+    stream = orch.stream_process("hello")
+    assert next(stream) == "one"
+
+    # The client went away mid-stream and the generator is never closed
+    done = []
+    worker = threading.Thread(target=lambda: done.append(orch.process("next")))
+    worker.start()
+    worker.join(timeout=5)
+
+    assert done == ["answered"]
+    stream.close()
+    orch.close()
+
+
+class _SearchTool:
+    """Finishes only once the profile read has started, so it must run concurrently."""
+
+    def __init__(self, orch, profile_started):
+        self.orch            = orch
+        self.profile_started = profile_started
+
+    async def ainvoke(self, args):
+        await asyncio.wait_for(self.profile_started.wait(), timeout=2)
+        self.orch._retrievals.append((f"[doc] {args['query']}", 7))
+        return [{"content": "...", "source": "doc"}]
+
+
+class _ProfileTool:
+    def __init__(self, started):
+        self.started = started
+
+    async def ainvoke(self, args):
+        self.started.set()
+        return {"user_id": "alice42"}
+
+
+def test_search_runs_alongside_read_only_tools(tmp_path):
+    orch = _bare_orchestrator(tmp_path)
+    calls = [
+        {"name": "search_financial_documents", "args": {"query": "roth ira"}, "id": "c1"},
+        {"name": "get_my_profile", "args": {}, "id": "c2"},
+    ]
+    messages = []
+
+    async def hop():
+        started = asyncio.Event()
+        orch._tool_map.update(
+            search_financial_documents=_SearchTool(orch, started),
+            get_my_profile=_ProfileTool(started),
+        )
+        await orch._run_tool_calls(messages, calls)
+
+    asyncio.run(hop())
+
+    assert [m.tool_call_id for m in messages] == ["c1", "c2"]
+    assert "error" not in messages[0].content
+    assert orch._retrievals == [("[doc] roth ira", 7)]
+
+
+def test_finish_turn_reports_every_search_of_the_turn(tmp_path):
+    orch = _bare_orchestrator(tmp_path)
+    orch.logger.start_turn("hi")
+    orch._retrievals = [("[doc] a", 5), ("[doc] b", 9)]
+
+    reply = orch._finish_turn("hi", "Hello!")
+
+    assert reply == "Hello!\n\n⏱ Retrieved in 9ms"
+    assert orch._retrievals == []
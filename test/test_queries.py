@@ -0,0 +1,145 @@
+"""
+db.queries tests against a scratch SQLite file built with setupDB's schema.
+"""
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip("bcrypt")
+
+import setupDB
+from db import queries
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = str(tmp_path / "cofina.db")
+    monkeypatch.setattr(setupDB, "DB_DIR", str(tmp_path))
+    monkeypatch.setattr(setupDB, "DB_PATH", path)
+    setupDB.main()
+    monkeypatch.setattr(queries, "DB_PATH", path)
+    monkeypatch.setattr(queries, "_known_user_ids", None)
+    queries._clear_existence_caches()
+    yield path
+    queries._clear_existence_caches()
+
+
+def _insert_elsewhere(path, user_id):
+    """Add a user row the way another process sharing cofina.db would."""
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "INSERT INTO users (user_id, first_name, email, password_hash,"
+            " secret_question, secret_answer_hash) VALUES (?, ?, ?, ?, ?, ?)",
+            (user_id, "Bob", f"{user_id}@example.com", "x", "q", "a"),
+        )
+
+
+def _register(user_id):
+    return queries.register_user(
+        user_id, "Alice", "", f"{user_id}@example.com", "hunter22", "First pet?", "Rex"
+    )
+
+
+# ── user_id_taken ───────────────────────────────────────────────────────
+
+def test_user_id_taken_tracks_in_process_registrations(db):
+    assert not queries.user_id_taken("alice42")
+    assert _register("alice42")
+    assert queries.user_id_taken("alice42")
+
+
+def test_id_added_behind_the_snapshot_is_caught_at_insert(db):
+    assert not queries.user_id_taken("bob7")        # snapshot loaded here
+    _insert_elsewhere(db, "bob7")
+
+    # The stale snapshot still answers "free"; the insert is what catches it
+    assert not queries.user_id_taken("bob7")
+    assert not _register("bob7")
+    assert queries.user_id_taken("bob7")
+
+
+def test_user_id_taken_forgets_deleted_users(db):
+    assert _register("alice42")
+    assert queries.user_id_taken("alice42")
+    assert queries.delete_user_data("alice42")
+    assert not queries.user_id_taken("alice42")
+
+
+# ── Existence probes ────────────────────────────────────────────────────
+
+def test_free_email_is_rechecked_after_another_process_takes_it(db):
+    assert not queries.email_exists("bob7@example.com")
+    _insert_elsewhere(db, "bob7")
+
+    assert queries.email_exists("bob7@example.com")
+    assert queries.user_exists("bob7")
+
+
+def test_taken_answers_are_memoized(db, monkeypatch):
+    _insert_elsewhere(db, "bob7")
+    assert queries.email_exists("bob7@example.com")
+
+    opened = []
+    real_connect = queries.get_connection
+    monkeypatch.setattr(queries, "get_connection", lambda: opened.append(1) or real_connect())
+
+    assert queries.email_exists("bob7@example.com")
+    assert opened == []
+
+
+# ── save_registration ───────────────────────────────────────────────────
+
+_FINANCE = {
+    "first_name":     "Alice",            # not a profile column, dropped
+    "monthly_income": 3500.0,
+    "annual_income":  42000.0,
+    "risk_profile":   "Moderate",
+    "short_term":     "Save $5 000",
+}
+
+
+def test_save_registration_writes_every_table(db):
+    assert _register("alice42")
+
+    ok = queries.save_registration(
+        "alice42",
+        profile=_FINANCE,
+        preferences=_FINANCE,
+        plan_name="Alice's Financial Plan",
+        short_term_goals={"description": "Save $5 000"},
+        long_term_goals={"description": "Buy a house"},
+        debts=[{"debt_type": "Credit Card", "total_amount": 1200, "interest_rate": 19.9}],
+    )
+
+    assert ok
+    user = queries.get_user_profile("alice42")
+    assert user["profile"]["monthly_income"] == 3500.0
+    assert user["profile"]["annual_income"] == 42000.0
+    assert user["preferences"]["risk_profile"] == "Moderate"
+    assert [d["debt_type"] for d in user["debts"]] == ["Credit Card"]
+    plan = queries.get_active_plan("alice42")
+    assert plan["plan_name"] == "Alice's Financial Plan"
+    assert plan["long_term_goals"] == {"description": "Buy a house"}
+
+
+def test_save_registration_writes_nothing_when_a_statement_fails(db, monkeypatch):
+    assert _register("alice42")
+
+    def broken_plan(conn, *args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(queries, "_insert_financial_plan", broken_plan)
+    ok = queries.save_registration(
+        "alice42",
+        profile=_FINANCE,
+        preferences=_FINANCE,
+        plan_name="Alice's Financial Plan",
+        short_term_goals={},
+        long_term_goals={},
+    )
+
+    assert not ok
+    user = queries.get_user_profile("alice42")
+    assert user["profile"] is None and user["preferences"] is None
+    assert queries.get_active_plan("alice42") is None
@@ -0,0 +1,111 @@
+"""
+Registration flow tests — the stage-1 insert runs in the background and is
+reconciled at confirm.  Database calls are replaced with fakes.
+"""
+
+import threading
+
+import pytest
+
+pytest.importorskip("bcrypt")
+
+import agents.registration_agent as registration_mod
+from agents.registration_agent import RegistrationAgent
+
+_ANSWERS = (
+    "register",
+    "alice42", "Alice", "alice@example.com", "hunter22",
+    "First pet?", "Rex",
+    "3,500", "moderate", "Save $5 000", "Buy a house",
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Fake db layer; ``db.gate`` holds register_user until it is set."""
+    class _DB:
+        gate       = threading.Event()
+        registered = []
+        created    = True
+        saved      = []
+
+    _DB.gate.set()
+
+    def register_user(user_id, *args):
+        _DB.gate.wait(5)
+        _DB.registered.append(user_id)
+        if isinstance(_DB.created, Exception):
+            raise _DB.created
+        return _DB.created
+
+    monkeypatch.setattr(registration_mod, "register_user", register_user)
+    monkeypatch.setattr(registration_mod, "user_id_taken", lambda user_id: False)
+    monkeypatch.setattr(registration_mod, "email_exists", lambda email: False)
+    monkeypatch.setattr(
+        registration_mod, "save_registration",
+        lambda user_id, **kw: _DB.saved.append(user_id) or True,
+    )
+    monkeypatch.setattr(registration_mod, "_STAGE1_WAIT_S", 0.05)
+    yield _DB
+    _DB.gate.set()
+
+
+def _to_confirm(agent):
+    for answer in _ANSWERS:
+        reply = agent.process(answer, {})
+    assert reply["data"]["field"] == "confirm"
+    return reply
+
+
+def test_confirm_after_background_insert_completes(db):
+    agent = RegistrationAgent()
+    _to_confirm(agent)
+
+    reply = agent.process("yes", {})
+
+    assert reply["action"] == "complete"
+    assert db.registered == ["alice42"] and db.saved == ["alice42"]
+    assert not agent.is_active()
+
+
+def test_slow_insert_at_confirm_keeps_state(db):
+    db.gate.clear()
+    agent = RegistrationAgent()
+    _to_confirm(agent)
+
+    reply = agent.process("yes", {})
+
+    # Not reported as a failure, nothing reset: the insert may still land
+    assert reply["action"] == "retry" and reply["data"]["field"] == "confirm"
+    assert agent.is_active() and agent.data["user_id"] == "alice42"
+    assert db.saved == []
+
+    db.gate.set()
+    reply = agent.process("yes", {})
+
+    assert reply["action"] == "complete"
+    assert db.registered == ["alice42"] and db.saved == ["alice42"]
+
+
+def test_failed_insert_resets_flow(db):
+    db.created = RuntimeError("disk I/O error")
+    agent = RegistrationAgent()
+    _to_confirm(agent)
+
+    reply = agent.process("yes", {})
+
+    assert reply["action"] == "error"
+    assert "database error" in reply["message"]
+    assert not agent.is_active() and db.saved == []
+
+
+def test_rejected_insert_resets_flow(db):
+    db.created = False
+    agent = RegistrationAgent()
+    _to_confirm(agent)
+
+    reply = agent.process("yes", {})
+
+    assert reply["action"] == "error"
+    assert "already be in use" in reply["message"]
+    assert not agent.is_active() and db.saved == []
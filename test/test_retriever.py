@@ -0,0 +1,101 @@
+"""
+SemanticCache tests with a fake vector store whose embeddings are fixed
+per query, so similarity is controlled exactly.
+"""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_openai")
+
+from RAG.retriever import SemanticCache
+
+_VECTORS = {
+    "what is a roth ira":    [1.0, 0.0, 0.0],
+    "explain roth iras":     [0.99, 0.05, 0.0],     # cosine ~0.999
+    "what is an index fund": [0.0, 1.0, 0.0],
+    "how do bonds work":     [0.0, 0.0, 1.0],
+}
+
+
+class _Embeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_query(self, query):
+        self.calls.append(query)
+        return _VECTORS[query]
+
+
+class _VectorStore:
+    def __init__(self):
+        self.embeddings = _Embeddings()
+        self.searches   = 0
+
+    def similarity_search_by_vector(self, vector, k):
+        self.searches += 1
+        return [f"doc for {vector}"] * k
+
+
+@pytest.fixture
+def store():
+    return _VectorStore()
+
+
+def test_exact_repeat_skips_embedding_and_search(store):
+    cache = SemanticCache(store, k=2)
+    first = cache.invoke("what is a roth ira")
+
+    assert cache.invoke("what is a roth ira") is first
+    assert store.embeddings.calls == ["what is a roth ira"]
+    assert store.searches == 1
+
+
+def test_paraphrase_reuses_the_nearest_entry(store):
+    cache = SemanticCache(store, k=2)
+    first = cache.invoke("what is a roth ira")
+
+    assert cache.invoke("explain roth iras") is first
+    assert store.searches == 1
+
+
+def test_unrelated_query_searches_again(store):
+    cache = SemanticCache(store, k=2)
+    cache.invoke("what is a roth ira")
+    cache.invoke("what is an index fund")
+
+    assert store.searches == 2
+
+
+def test_expired_entries_are_searched_again(store):
+    cache = SemanticCache(store, k=2, ttl_seconds=-1.0)
+    cache.invoke("what is a roth ira")
+    cache.invoke("what is a roth ira")
+
+    assert store.searches == 2
+
+
+def test_least_recently_used_entry_is_evicted(store):
+    cache = SemanticCache(store, k=2, max_entries=2)
+    cache.invoke("what is a roth ira")
+    cache.invoke("what is an index fund")
+    cache.invoke("what is a roth ira")          # refresh
+    cache.invoke("how do bonds work")           # evicts the index fund
+
+    cache.invoke("what is a roth ira")
+    assert store.searches == 3
+    cache.invoke("what is an index fund")
+    assert store.searches == 4
+
+
+def test_abatch_keeps_query_order(store):
+    cache   = SemanticCache(store, k=1)
+    queries = ["how do bonds work", "what is a roth ira", "explain roth iras"]
+
+    results = asyncio.run(cache.abatch(queries))
+
+    assert results[0] == ["doc for [0.0, 0.0, 1.0]"]
+    assert results[1] == ["doc for [1.0, 0.0, 0.0]"]
+    assert len(results) == 3